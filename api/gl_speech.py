@@ -2,7 +2,8 @@
 Voice-driven interface for chatting with Cerebras-hosted LLMs.
 
 Requires the following third-party packages:
-    pip install speechrecognition sounddevice scipy pyttsx3 cerebras-cloud-sdk langchain-core langchain python-dotenv
+    pip install speechrecognition sounddevice numpy pyttsx3 cerebras-cloud-sdk langchain-core langchain python-dotenv
+    pip install vosk webrtcvad      (optional, for STT_BACKEND=vosk)
 
 Environment variables:
     CEREBRAS_API_KEY        -> Required. Key from cerebras.ai
@@ -16,6 +17,19 @@ Environment variables:
     INITIAL_PROMPT          -> Optional greeting/intro message from AI
     SILENCE_THRESHOLD       -> Seconds of silence before responding (default 3.0)
     SESSION_MODE            -> quick_review, deep_dive, practice, exam_prep, exploratory (default: exploratory)
+    CEREBRAS_SUMMARY_MODEL  -> Optional. Small model used for running session summaries (default "llama3.1-8b")
+    HISTORY_MAX_TURNS       -> Recent exchanges kept verbatim in the prompt (default 6)
+    SEMANTIC_CACHE          -> Reuse answers to near-duplicate questions (default false;
+                               needs: pip install sentence-transformers faiss-cpu)
+    SEMANTIC_CACHE_PATH     -> Where the semantic cache is persisted (default .parley_semantic_cache.pkl)
+    STT_BACKEND             -> google (cloud, default) or vosk (local streaming)
+    VOSK_MODEL_PATH         -> Optional. Path to a Vosk model directory (default: download small en-us)
+    VAD_SILENCE_MS          -> Milliseconds of VAD silence that end an utterance with vosk (default 300)
+    SPECULATIVE_LLM         -> With vosk, start the LLM on a stable partial transcript (default true)
+    BARGE_IN                -> Interrupt speech when the student talks over it; there is no echo
+                               cancellation, so use with headphones (default false)
+    BARGE_IN_THRESHOLD      -> Microphone RMS (int16) that counts as talking over (default 1500)
+    TTS_FILLER              -> Speak a short acknowledgement as soon as the model starts answering (default false)
 
 Usage:
     export CEREBRAS_API_KEY="..."
@@ -25,19 +39,32 @@ Usage:
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
+import importlib.util
+import inspect
+import json
 import os
+import pickle
+import queue
+import random
+import re
 import signal
 import sys
+import threading
 import time
 import subprocess
-from dataclasses import dataclass, field
-from typing import List, Optional, Sequence, Tuple
+from collections import deque
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Callable, Deque, List, Mapping, Optional, Sequence, Tuple
 
 from dotenv import load_dotenv
 from pydantic import ConfigDict
 
 try:
-    from langchain_core.callbacks.manager import CallbackManagerForLLMRun
+    from langchain_core.callbacks.manager import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
     from langchain_core.language_models.chat_models import BaseChatModel
     from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
     from langchain_core.outputs import ChatGeneration, ChatResult
@@ -45,7 +72,7 @@ except ImportError as exc:  # pragma: no cover
     BaseChatModel = None  # type: ignore
     AIMessage = BaseMessage = HumanMessage = SystemMessage = None  # type: ignore
     ChatGeneration = ChatResult = None  # type: ignore
-    CallbackManagerForLLMRun = None  # type: ignore
+    CallbackManagerForLLMRun = AsyncCallbackManagerForLLMRun = None  # type: ignore
     _LANGCHAIN_IMPORT_ERROR = exc
 else:
     _LANGCHAIN_IMPORT_ERROR = None
@@ -58,38 +85,61 @@ except ImportError as exc:
 else:
     _SR_IMPORT_ERROR = None
 
-# Try PyAudio first, fall back to SoundDevice
-try:
-    import pyaudio  # noqa
-    _HAS_PYAUDIO = True
-except ImportError:
-    _HAS_PYAUDIO = False
-    try:
-        import sounddevice as sd
-        import scipy.io.wavfile as wavfile
-        import numpy as np
-        _HAS_SOUNDDEVICE = True
-        print("⚠️ PyAudio not found, using SoundDevice backend for microphone input.")
-    except ImportError as exc:
-        _HAS_SOUNDDEVICE = False
-        _SOUNDDEVICE_IMPORT_ERROR = exc
-
-try:
-    import pyttsx3
-except ImportError as exc:
-    pyttsx3 = None  # type: ignore
-    _TTS_ENGINE_IMPORT_ERROR = exc
-else:
-    _TTS_ENGINE_IMPORT_ERROR = None
+# Try PyAudio first, fall back to SoundDevice. Only probe for the audio and TTS
+# backends here; importing them costs hundreds of ms, so that waits for first use.
+_HAS_PYAUDIO = importlib.util.find_spec("pyaudio") is not None
+_HAS_SOUNDDEVICE = all(importlib.util.find_spec(name) is not None for name in ("sounddevice", "numpy"))
+_HAS_PYTTSX3 = importlib.util.find_spec("pyttsx3") is not None
+_HAS_VOSK = all(importlib.util.find_spec(name) is not None for name in ("vosk", "webrtcvad"))
 
 try:
-    from cerebras.cloud.sdk import Cerebras
+    import httpx
+    from cerebras.cloud.sdk import AsyncCerebras, Cerebras
 except ImportError as exc:
-    Cerebras = None  # type: ignore
+    httpx = None  # type: ignore
+    AsyncCerebras = Cerebras = None  # type: ignore
     _CEREBRAS_IMPORT_ERROR = exc
 else:
     _CEREBRAS_IMPORT_ERROR = None
 
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+_HAS_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _lazy_numpy():
+    import numpy
+
+    return numpy
+
+
+@functools.lru_cache(maxsize=1)
+def _lazy_sounddevice():
+    import sounddevice
+
+    return sounddevice
+
+
+@functools.lru_cache(maxsize=1)
+def _lazy_pyttsx3():
+    import pyttsx3
+
+    return pyttsx3
+
+
+@functools.lru_cache(maxsize=1)
+def _lazy_vosk():
+    import vosk
+
+    return vosk
+
+
+@functools.lru_cache(maxsize=1)
+def _lazy_webrtcvad():
+    import webrtcvad
+
+    return webrtcvad
+
 
 # ========== DEFAULT CONSTANTS ==========
 DEFAULT_EXIT_PHRASES: Tuple[str, ...] = ("quit", "exit", "stop", "goodbye", "good bye", "that's all")
@@ -98,7 +148,38 @@ DEFAULT_MAX_TOKENS = 300  # Reduced from 500 to keep responses shorter
 DEFAULT_TEMPERATURE = 0.6
 DEFAULT_TOP_P = 0.95
 DEFAULT_SILENCE_THRESHOLD = 3.0
+DEFAULT_VAD_SILENCE_MS = 300
+SPECULATION_STABLE_SECONDS = 0.5  # Partial transcript must hold this long before we speculate
+SPECULATION_MIN_CHARS = 8
+SPECULATION_TOLERANCE = 3  # Trailing chars the final transcript may differ by and still reuse the answer
+DEFAULT_BARGE_IN_THRESHOLD = 1500
+BARGE_IN_FRAMES = 5  # Consecutive 20 ms frames above threshold before cutting speech
 SUMMARY_INTERVAL = 5  # Summarize every 5 exchanges
+DEFAULT_SUMMARY_MODEL = "llama3.1-8b"
+DEFAULT_SUMMARY_MAX_TOKENS = 150
+DEFAULT_SEMANTIC_CACHE_PATH = ".parley_semantic_cache.pkl"
+SEMANTIC_CACHE_THRESHOLD = 0.92  # Cosine similarity needed to reuse a cached answer
+SEMANTIC_CACHE_CONTEXT_MESSAGES = 2  # Trailing history messages that must match for a hit
+DEFAULT_HISTORY_MAX_TURNS = 6  # Must exceed SUMMARY_INTERVAL so no turn is evicted unsummarized
+SUMMARY_INSTRUCTION = (
+    "You summarize tutoring sessions. Given an optional earlier summary and the latest exchanges, "
+    "write a 1-2 sentence summary of what the student has covered and where they are struggling. "
+    "Do not use emojis or role tags."
+)
+
+# A sentence ends at a newline, or at terminal punctuation once the following
+# whitespace has arrived (so "3.5" or "e.g." mid-stream is not split early).
+_SENTENCE_END_RE = re.compile(r"[.!?]+(?=\s)|\n")
+_ROLE_TAG_RE = re.compile(r"\[(?:Expert|TA)\]:?\s*")
+_ROLE_PREFIX_RE = re.compile(r"\[(Expert|TA)\]\s*")
+_ROLE_LABELS = {"Expert": "🎓 Expert", "TA": "👨‍🏫 TA"}
+_THINK_TAG_RE = re.compile(r"</?think>")
+_THINK_TAGS = ("<think>", "</think>")
+# Streamed text is written to the terminal in batches of about this many chars
+OUTPUT_BATCH_CHARS = 40
+_OUTPUT_BATCH_BOUNDARIES = (".", "!", "?", "\n")
+# Spoken on the first streamed token when TTS_FILLER is on, covering <think> time
+FILLER_PHRASES: Tuple[str, ...] = ("Okay.", "Sure.", "Good question.", "Alright.", "Let me think.", "Hmm, okay.")
 
 
 # ========== ENV + PROMPT HELPERS ==========
@@ -113,27 +194,19 @@ def _comma_env(name: str, fallback: Sequence[str]) -> Tuple[str, ...]:
     return cleaned or tuple(fallback)
 
 
-def _get_system_prompt(session_mode: str) -> str:
-    """Return enhanced system prompt with all improvements."""
-    custom = os.getenv("SYSTEM_PROMPT")
-    if custom:
-        return custom
-    
-    # Session-specific guidance
-    mode_instructions = {
-        "quick_review": "Focus on brief, high-level summaries. Hit key points quickly.",
-        "deep_dive": "Provide comprehensive, detailed explanations. Go deep into theory and context.",
-        "practice": "Focus on problems, exercises, and hands-on application. Guide through solutions.",
-        "exam_prep": "Emphasize key concepts, common pitfalls, and test-taking strategies.",
-        "exploratory": "Follow the student's curiosity. Allow tangential discussions and connections."
-    }
-    
-    mode_instruction = mode_instructions.get(session_mode, mode_instructions["exploratory"])
-    
-    return f"""You are an adaptive educational AI tutor helping students learn. The user is ALWAYS the Student.
+# Session-specific guidance
+_MODE_INSTRUCTIONS = {
+    "quick_review": "Focus on brief, high-level summaries. Hit key points quickly.",
+    "deep_dive": "Provide comprehensive, detailed explanations. Go deep into theory and context.",
+    "practice": "Focus on problems, exercises, and hands-on application. Guide through solutions.",
+    "exam_prep": "Emphasize key concepts, common pitfalls, and test-taking strategies.",
+    "exploratory": "Follow the student's curiosity. Allow tangential discussions and connections."
+}
 
-SESSION MODE: {session_mode.upper()}
-{mode_instruction}
+_SYSTEM_TEMPLATE = """You are an adaptive educational AI tutor helping students learn. The user is ALWAYS the Student.
+
+SESSION MODE: {mode}
+{instruction}
 
 === ROLE SELECTION ===
 Choose your role dynamically based on each question:
@@ -229,22 +302,30 @@ Response: "[TA] No problem, let's approach it differently. Think of it this way:
 
 Remember: You're not just answering questions - you're building understanding, confidence, and curiosity."""
 
+# Built once at import: every Config and every request then share the exact
+# same prefix string, which is what provider-side prompt (KV) caching keys on.
+_SYSTEM_PROMPTS: Mapping[str, str] = MappingProxyType({
+    mode: _SYSTEM_TEMPLATE.format(mode=mode.upper(), instruction=instruction)
+    for mode, instruction in _MODE_INSTRUCTIONS.items()
+})
+
+_INITIAL_PROMPTS: Mapping[str, str] = MappingProxyType({
+    "quick_review": "Hi! I'm your AI tutor. I see you're in quick review mode - I'll keep things concise and hit the key points. What topic should we review?",
+    "deep_dive": "Hello! I'm your AI tutor in deep dive mode - we'll explore concepts thoroughly and dig into the details. What would you like to understand deeply today?",
+    "practice": "Hey! I'm your AI tutor in practice mode - I'll focus on problems and hands-on application. What would you like to practice?",
+    "exam_prep": "Hi! I'm your AI tutor in exam prep mode - I'll emphasize key concepts and help you prepare effectively. What exam or topic are you studying for?",
+    "exploratory": "Hello! I'm your adaptive AI tutor. I'll switch between being an Expert professor for deep explanations, and a TA tutor for practice and guidance. What are you curious about today?"
+})
+
+
+def _get_system_prompt(session_mode: str) -> str:
+    """Return enhanced system prompt with all improvements."""
+    return os.getenv("SYSTEM_PROMPT") or _SYSTEM_PROMPTS.get(session_mode, _SYSTEM_PROMPTS["exploratory"])
+
 
 def _get_initial_prompt(session_mode: str) -> str:
     """Get session-appropriate initial prompt."""
-    custom = os.getenv("INITIAL_PROMPT")
-    if custom:
-        return custom
-    
-    prompts = {
-        "quick_review": "Hi! I'm your AI tutor. I see you're in quick review mode - I'll keep things concise and hit the key points. What topic should we review?",
-        "deep_dive": "Hello! I'm your AI tutor in deep dive mode - we'll explore concepts thoroughly and dig into the details. What would you like to understand deeply today?",
-        "practice": "Hey! I'm your AI tutor in practice mode - I'll focus on problems and hands-on application. What would you like to practice?",
-        "exam_prep": "Hi! I'm your AI tutor in exam prep mode - I'll emphasize key concepts and help you prepare effectively. What exam or topic are you studying for?",
-        "exploratory": "Hello! I'm your adaptive AI tutor. I'll switch between being an Expert professor for deep explanations, and a TA tutor for practice and guidance. What are you curious about today?"
-    }
-    
-    return prompts.get(session_mode, prompts["exploratory"])
+    return os.getenv("INITIAL_PROMPT") or _INITIAL_PROMPTS.get(session_mode, _INITIAL_PROMPTS["exploratory"])
 
 
 # ========== CONFIGURATION ==========
@@ -259,10 +340,21 @@ class Config:
     cerebras_max_tokens: int = field(default_factory=lambda: int(os.getenv("CEREBRAS_MAX_TOKENS", str(DEFAULT_MAX_TOKENS))))
     cerebras_temperature: float = field(default_factory=lambda: float(os.getenv("CEREBRAS_TEMPERATURE", str(DEFAULT_TEMPERATURE))))
     cerebras_top_p: float = field(default_factory=lambda: float(os.getenv("CEREBRAS_TOP_P", str(DEFAULT_TOP_P))))
+    summary_model: str = field(default_factory=lambda: os.getenv("CEREBRAS_SUMMARY_MODEL", DEFAULT_SUMMARY_MODEL))
+    history_max_turns: int = field(default_factory=lambda: int(os.getenv("HISTORY_MAX_TURNS", str(DEFAULT_HISTORY_MAX_TURNS))))
+    semantic_cache: bool = field(default_factory=lambda: os.getenv("SEMANTIC_CACHE", "false").lower() == "true")
+    semantic_cache_path: str = field(default_factory=lambda: os.getenv("SEMANTIC_CACHE_PATH", DEFAULT_SEMANTIC_CACHE_PATH))
     exit_phrases: Tuple[str, ...] = field(default_factory=lambda: _comma_env("EXIT_PHRASES", DEFAULT_EXIT_PHRASES))
     energy_threshold: int = field(default_factory=lambda: int(os.getenv("ENERGY_THRESHOLD", "300")))
     silence_threshold: float = field(default_factory=lambda: float(os.getenv("SILENCE_THRESHOLD", str(DEFAULT_SILENCE_THRESHOLD))))
     phrase_time_limit: Optional[int] = field(default_factory=lambda: int(os.getenv("PHRASE_TIME_LIMIT", "30")) if os.getenv("PHRASE_TIME_LIMIT") else 30)
+    stt_backend: str = field(default_factory=lambda: os.getenv("STT_BACKEND", "google").strip().lower())
+    vosk_model_path: str = field(default_factory=lambda: os.getenv("VOSK_MODEL_PATH", "").strip())
+    vad_silence_ms: int = field(default_factory=lambda: int(os.getenv("VAD_SILENCE_MS", str(DEFAULT_VAD_SILENCE_MS))))
+    speculative_llm: bool = field(default_factory=lambda: os.getenv("SPECULATIVE_LLM", "true").lower() == "true")
+    barge_in: bool = field(default_factory=lambda: os.getenv("BARGE_IN", "false").lower() == "true")
+    barge_in_threshold: float = field(default_factory=lambda: float(os.getenv("BARGE_IN_THRESHOLD", str(DEFAULT_BARGE_IN_THRESHOLD))))
+    tts_filler: bool = field(default_factory=lambda: os.getenv("TTS_FILLER", "false").lower() == "true")
 
     def validate(self) -> None:
         if not self.cerebras_api_key:
@@ -274,12 +366,56 @@ class Config:
         if sr is None:
             raise SystemExit(f"speechrecognition is not installed. Details: {_SR_IMPORT_ERROR}")
         if not _HAS_PYAUDIO and not _HAS_SOUNDDEVICE:
-            raise SystemExit("Neither PyAudio nor SoundDevice is installed. Install one: pip install sounddevice scipy")
-        if pyttsx3 is None:
-            raise SystemExit(f"pyttsx3 is not installed. Details: {_TTS_ENGINE_IMPORT_ERROR}")
+            raise SystemExit("Neither PyAudio nor SoundDevice is installed. Install one: pip install sounddevice numpy")
+        if not _HAS_PYTTSX3 and sys.platform != 'darwin':  # macOS speaks with 'say'
+            raise SystemExit("pyttsx3 is not installed. Install it: pip install pyttsx3")
+        if self.stt_backend == "vosk" and not _HAS_VOSK:
+            raise SystemExit("vosk/webrtcvad are not installed (pip install vosk webrtcvad sounddevice).")
 
 
 # ========== SPEECH RECOGNITION WITH SILENCE DETECTION ==========
+class VADetector:
+    """Energy-based voice activity detector; RMS is computed with NumPy ufuncs, not a Python loop.
+
+    Quiet frames (below ``min_energy``) from the first ``CALIBRATION_MS`` of
+    audio are treated as ambient noise, and the speech threshold becomes
+    ``NOISE_MARGIN`` times their RMS, never lower than ``min_energy``. Until
+    then ``min_energy`` alone decides, so speech at the very start of a capture
+    is neither missed nor mistaken for background. Keep one detector per
+    microphone so calibration happens once, not on every capture.
+    """
+
+    CALIBRATION_MS = 500
+    NOISE_MARGIN = 1.5
+
+    def __init__(self, frame_ms: int, min_energy: float = 1.0) -> None:
+        # Floor of at least 1.0 so digital silence does not make every frame "speech"
+        self.min_energy = max(float(min_energy), 1.0)
+        self.energy = self.min_energy
+        self._calibration_frames = max(self.CALIBRATION_MS // frame_ms, 1)
+        self._ambient: List[float] = []
+
+    @staticmethod
+    def rms(frame: np.ndarray) -> float:
+        np = _lazy_numpy()
+        return float(np.sqrt(np.mean(frame.astype(np.int32) ** 2)))
+
+    @property
+    def calibrated(self) -> bool:
+        return len(self._ambient) >= self._calibration_frames
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        rms = self.rms(frame)
+        if self.calibrated:
+            return rms > self.energy
+        if rms > self.min_energy:
+            return True
+        self._ambient.append(rms)
+        if self.calibrated:
+            self.energy = max(self.NOISE_MARGIN * sum(self._ambient) / len(self._ambient), self.min_energy)
+        return False
+
+
 class SpeechRecognizer:
     def __init__(self, config: Config) -> None:
         self.recognizer = sr.Recognizer()
@@ -287,6 +423,9 @@ class SpeechRecognizer:
         self.recognizer.pause_threshold = config.silence_threshold
         self.phrase_time_limit = config.phrase_time_limit
         self.use_pyaudio = _HAS_PYAUDIO
+        self._vad: Optional[VADetector] = None  # Calibrated on the first sounddevice capture, then reused
+        if not self.use_pyaudio:
+            print("⚠️ PyAudio not found, using SoundDevice backend for microphone input.")
 
     def listen(self) -> Optional[str]:
         if self.use_pyaudio:
@@ -312,29 +451,53 @@ class SpeechRecognizer:
 
     def _listen_sounddevice(self) -> Optional[str]:
         """Use SoundDevice backend as fallback with silence detection."""
+        sample_rate = 16000
+        frame_ms = 20
+        blocksize = sample_rate * frame_ms // 1000
+        max_frames = int((self.phrase_time_limit or 30) * 1000 / frame_ms)
+        silence_frames_needed = int(self.recognizer.pause_threshold * 1000 / frame_ms)
+        if self._vad is None:
+            self._vad = VADetector(frame_ms, min_energy=self.recognizer.energy_threshold)
+        vad = self._vad
+        sd = _lazy_sounddevice()
+        np = _lazy_numpy()
+
+        frames: List[np.ndarray] = []
+        done = threading.Event()
+        heard_speech = False
+        silence_frames = 0
+
+        def _callback(indata, _frames, _time, status) -> None:
+            nonlocal heard_speech, silence_frames
+            if done.is_set():
+                return
+            frames.append(indata.copy())
+            if vad.is_speech(indata):
+                heard_speech = True
+                silence_frames = 0
+            elif heard_speech:
+                silence_frames += 1
+            if (heard_speech and silence_frames >= silence_frames_needed) or len(frames) >= max_frames:
+                done.set()
+
         try:
-            import tempfile
-            
             print("🎤 Listening...")
-            
-            duration = self.phrase_time_limit if self.phrase_time_limit else 30
-            sample_rate = 16000
-            
-            audio_data = sd.rec(
-                int(duration * sample_rate),
+            with sd.InputStream(
                 samplerate=sample_rate,
+                blocksize=blocksize,
                 channels=1,
-                dtype=np.int16
-            )
-            sd.wait()
-            
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            wavfile.write(temp_file.name, sample_rate, audio_data)
-            
-            with sr.AudioFile(temp_file.name) as source:
-                audio = self.recognizer.record(source)
-            
-            os.unlink(temp_file.name)
+                dtype='int16',
+                callback=_callback,
+            ):
+                done.wait()
+
+            if not heard_speech:
+                print("Transcription: (could not understand audio)")
+                return None
+
+            # Hand the PCM straight to the recognizer; no WAV round-trip through disk
+            audio_data = np.ascontiguousarray(np.concatenate(frames))
+            audio = sr.AudioData(audio_data.tobytes(), sample_rate, audio_data.dtype.itemsize)
             
             text = self.recognizer.recognize_google(audio)
             return text.strip()
@@ -350,127 +513,457 @@ class SpeechRecognizer:
             return None
 
 
+# ========== LOCAL STREAMING SPEECH RECOGNITION ==========
+class LocalStreamingSTT:
+    """Offline recognizer: Vosk decodes while audio streams in, WebRTC VAD ends the turn."""
+
+    SAMPLE_RATE = 16000
+    FRAME_MS = 30  # webrtcvad accepts 10/20/30 ms frames
+    FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+    def __init__(self, config: Config) -> None:
+        self._sd = _lazy_sounddevice()
+        self._vosk = _lazy_vosk()
+        # Loading the acoustic model is the expensive part; do it once
+        if config.vosk_model_path:
+            self.model = self._vosk.Model(config.vosk_model_path)
+        else:
+            self.model = self._vosk.Model(lang="en-us")
+        self.vad = _lazy_webrtcvad().Vad(3)
+        self.end_silence_ms = config.vad_silence_ms
+        self.phrase_time_limit = config.phrase_time_limit
+
+    def listen(self, on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """Capture one utterance; ``on_partial`` sees each new interim hypothesis."""
+        rec = self._vosk.KaldiRecognizer(self.model, self.SAMPLE_RATE)
+        frames: "queue.Queue[bytes]" = queue.Queue()
+
+        def _callback(indata, _frames, _time, status) -> None:
+            frames.put(bytes(indata))
+
+        parts: List[str] = []
+        last_partial = ""
+        heard_speech = False
+        silent_ms = 0
+        total_ms = 0
+        limit_ms = self.phrase_time_limit * 1000 if self.phrase_time_limit else None
+        try:
+            with self._sd.RawInputStream(
+                samplerate=self.SAMPLE_RATE,
+                blocksize=self.FRAME_SAMPLES,
+                dtype='int16',
+                channels=1,
+                callback=_callback,
+            ):
+                print("🎤 Listening...")
+                while True:
+                    frame = frames.get()
+                    # Vosk finalizes segments on its own pauses; keep them
+                    if rec.AcceptWaveform(frame):
+                        parts.append(json.loads(rec.Result()).get("text", ""))
+                    elif on_partial is not None:
+                        partial = json.loads(rec.PartialResult()).get("partial", "")
+                        hypothesis = " ".join(part for part in (*parts, partial) if part)
+                        if hypothesis != last_partial:
+                            last_partial = hypothesis
+                            on_partial(hypothesis)
+                    if self.vad.is_speech(frame, self.SAMPLE_RATE):
+                        heard_speech = True
+                        silent_ms = 0
+                    elif heard_speech:
+                        silent_ms += self.FRAME_MS
+                    total_ms += self.FRAME_MS
+                    if heard_speech and silent_ms >= self.end_silence_ms:
+                        break
+                    if limit_ms is not None and total_ms >= limit_ms:
+                        break
+        except Exception as exc:
+            print(f"Local speech recognition failed: {exc}", file=sys.stderr)
+            return None
+
+        parts.append(json.loads(rec.FinalResult()).get("text", ""))
+        text = " ".join(part for part in parts if part).strip()
+        if not text:
+            print("Transcription: (could not understand audio)")
+            return None
+        return text
+
+
 # ========== TEXT TO SPEECH ==========
 # ========== TEXT TO SPEECH (Robust Version) ==========
 class TextToSpeechEngine:
+    """Speak text on a persistent worker thread that owns a single TTS engine.
+
+    ``speak`` only enqueues text, so callers never block on synthesis; use
+    ``flush`` to wait until everything queued so far has been spoken. With
+    macOS ``say`` the worker only waits for the previous clip before starting
+    the next one, so it can pick up queued text while audio is still playing.
+
+    ``cancel`` may be called from any thread. pyttsx3 engines are thread-affine,
+    so it only bumps a generation counter; the worker notices the change from
+    the engine's word callback and stops the engine on its own thread.
+    """
+
     def __init__(self) -> None:
         self.use_system_say = False
         self.engine = None
-        self._init_engine()
+        self._busy = False
+        self._current_proc: Optional[subprocess.Popen] = None
+        self._generation = 0  # Bumped by cancel; queued text from older generations is dropped
+        self._speaking_generation = 0
+        self._q: "queue.Queue[Tuple[int, str]]" = queue.Queue()
+        self._thr = threading.Thread(target=self._worker, daemon=True)
+        self._thr.start()
 
     def _init_engine(self):
-        """Initialize or reinitialize TTS engine."""
+        """Initialize the TTS engine (called once, on the worker thread)."""
+        # pyttsx3 needs reinitializing before every utterance on macOS, so use
+        # the native 'say' command there instead of paying that cost per call
+        if sys.platform == 'darwin':
+            print("✓ Text-to-speech initialized (macOS 'say')")
+            self.use_system_say = True
+            return
         try:
-            import pyttsx3
-            self.engine = pyttsx3.init()
+            self.engine = _lazy_pyttsx3().init()
             self.engine.setProperty('rate', 175)
             self.engine.setProperty('volume', 1.0)
+            self.engine.connect('started-word', self._on_word)
             print("✓ Text-to-speech initialized (pyttsx3)")
         except Exception as e:
             print(f"⚠️ pyttsx3 failed: {e}")
-            if sys.platform == 'darwin':
-                print("→ Falling back to macOS 'say' command")
-                self.use_system_say = True
-            else:
-                print("⚠️ No TTS available")
+            print("⚠️ No TTS available")
+
+    def _worker(self) -> None:
+        # pyttsx3 engines are thread-affine, so create and use it on this thread only
+        self._init_engine()
+        while True:
+            generation, text = self._q.get()
+            if generation != self._generation:
+                self._q.task_done()  # Queued before a cancel
+                continue
+            self._speaking_generation = generation
+            self._busy = True
+            try:
+                self._speak_now(text)
+            finally:
+                self._busy = False
+                self._q.task_done()
+
+    def _on_word(self, name, location, length) -> None:
+        # Runs on the worker thread inside runAndWait, where stopping the engine is safe
+        if self._speaking_generation != self._generation:
+            self.engine.stop()
+
+    @property
+    def speaking(self) -> bool:
+        """True while text is being synthesized or a ``say`` clip is still playing."""
+        proc = self._current_proc
+        return self._busy or (proc is not None and proc.poll() is None)
+
+    def _wait_playback(self) -> None:
+        proc = self._current_proc
+        if proc is not None:
+            proc.wait()
 
     def speak(self, text: str) -> None:
+        """Queue text for speech and return immediately."""
         if not text:
             return
+        self._q.put((self._generation, text))
 
+    def flush(self) -> None:
+        """Block until all queued text has been spoken."""
+        self._q.join()
+        self._wait_playback()
+
+    def cancel(self) -> None:
+        """Drop any queued text and cut off the utterance currently playing."""
+        self._generation += 1
+        while True:
+            try:
+                self._q.get_nowait()
+            except queue.Empty:
+                break
+            self._q.task_done()
+        proc = self._current_proc
+        if proc is not None and proc.poll() is None:
+            proc.terminate()
+
+    def _speak_now(self, text: str) -> None:
         print(f"[DEBUG] Speaking: {text[:60]}...")  # Preview first 60 chars
 
         try:
             if self.use_system_say:
-                subprocess.run(['say', text], check=False)
+                # Play in the background; only the next clip has to wait for this one
+                self._wait_playback()
+                self._current_proc = subprocess.Popen(
+                    ['say', text],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
                 return
 
-            # Some versions of pyttsx3 require reinitialization each call on macOS
-            if sys.platform == 'darwin':
-                self._init_engine()
-
             if self.engine:
                 self.engine.say(text)
                 self.engine.runAndWait()
-                time.sleep(0.25)  # slight buffer between responses
             else:
                 print("⚠️ No TTS engine available")
 
         except Exception as e:
             print(f"⚠️ TTS error: {e}")
-            # Attempt fallback on macOS
-            if sys.platform == 'darwin':
-                try:
-                    subprocess.run(['say', text], check=False)
-                except Exception as e2:
-                    print(f"⚠️ macOS 'say' fallback failed: {e2}")
+
+
+# ========== SENTENCE-LEVEL TTS STREAMING ==========
+def _find_sentence_end(buffer: str) -> int:
+    """Return the index of the last character of the first complete sentence, or -1."""
+    match = _SENTENCE_END_RE.search(buffer)
+    return match.end() - 1 if match else -1
+
+
+class TTSStreamer:
+    """Speak streamed LLM text one sentence at a time on a consumer thread.
+
+    Producers put text pieces on ``queue``; a ``None`` sentinel marks the end of
+    a response and flushes whatever partial sentence is left in the buffer.
+    """
+
+    def __init__(self, tts: TextToSpeechEngine) -> None:
+        self.tts = tts
+        self.queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def wait(self) -> None:
+        """Block until every queued piece has been spoken."""
+        self.queue.join()
+        self.tts.flush()
+        # Every piece up to the sentinel is consumed, so a cancel is now spent
+        self._cancelled.clear()
+
+    def cancel(self) -> None:
+        """Stop speaking and discard the rest of the current response."""
+        self._cancelled.set()
+        self.tts.cancel()
+
+    def _run(self) -> None:
+        buffer = ""
+        while True:
+            piece = self.queue.get()
+            try:
+                if piece is None:
+                    if not self._cancelled.is_set():
+                        self._emit(buffer)
+                    buffer = ""
+                    continue
+                if self._cancelled.is_set():
+                    buffer = ""
+                    continue
+                buffer += piece
+                while (idx := _find_sentence_end(buffer)) != -1:
+                    self._emit(buffer[: idx + 1])
+                    buffer = buffer[idx + 1 :]
+            except Exception as exc:
+                print(f"⚠️ TTS streaming error: {exc}", file=sys.stderr)
+            finally:
+                self.queue.task_done()
+
+    def _emit(self, sentence: str) -> None:
+        # Role tags are for the transcript only; never read them aloud
+        sentence = _ROLE_TAG_RE.sub("", sentence).strip()
+        if sentence:
+            self.tts.speak(sentence)
 
 
 
 # ========== LANGCHAIN-CEREBRAS CHAT MODEL ==========
+def _cerebras_init_kwargs(api_key: str, base_url: str, http_client_cls) -> dict:
+    init_kwargs = {
+        "api_key": api_key,
+        # Keep-alive pool so every turn reuses the same TLS connection
+        "http_client": http_client_cls(
+            http2=_HAS_HTTP2,
+            limits=httpx.Limits(max_keepalive_connections=4),
+        ),
+    }
+    if base_url:
+        init_kwargs["base_url"] = base_url
+    return init_kwargs
+
+
+@functools.lru_cache(maxsize=1)
+def _get_cerebras_client(api_key: str, base_url: str) -> Cerebras:
+    """Process-wide sync client, shared by every chat model instance."""
+    return Cerebras(**_cerebras_init_kwargs(api_key, base_url, httpx.Client))
+
+
+@functools.lru_cache(maxsize=1)
+def _get_async_cerebras_client(api_key: str, base_url: str) -> AsyncCerebras:
+    """Process-wide async client, shared by every chat model instance."""
+    return AsyncCerebras(**_cerebras_init_kwargs(api_key, base_url, httpx.AsyncClient))
+
+
+_MESSAGE_ROLES = {SystemMessage: "system", AIMessage: "assistant", HumanMessage: "user"}
+
+
+def _convert_message(message: BaseMessage) -> dict:
+    role = _MESSAGE_ROLES.get(type(message))
+    if role is None:
+        role = next((name for cls, name in _MESSAGE_ROLES.items() if isinstance(message, cls)), "user")
+    content = message.content
+    if isinstance(content, list):
+        content = "\n".join(
+            fragment if isinstance(fragment, str) else str(fragment["text"])
+            for fragment in content
+            if isinstance(fragment, str) or (isinstance(fragment, dict) and "text" in fragment)
+        )
+    return {"role": role, "content": str(content)}
+
+
 class LangChainCerebrasChat(BaseChatModel):
     client: Optional[Cerebras] = None
+    async_client: Optional[AsyncCerebras] = None
     config: Optional[Config] = None
     last_stream_printed: bool = False
+    echo: bool = True
     _inside_think: bool = False
+    _think_carry: str = ""
+    _out_buf: Optional[List[str]] = None
+    _out_len: int = 0
+    _tts_queue: Optional[queue.Queue] = None
+    _converted: Optional[dict] = None
 
     model_config = ConfigDict(arbitrary_types_allowed=True, extra="allow")
 
-    def __init__(self, config: Config) -> None:
-        super().__init__(config=config)
-        init_kwargs = {"api_key": config.cerebras_api_key}
-        if config.cerebras_base_url:
-            init_kwargs["base_url"] = config.cerebras_base_url
-        self.client = Cerebras(**init_kwargs)
+    def __init__(self, config: Config, tts_queue: Optional[queue.Queue] = None, echo: bool = True) -> None:
+        super().__init__(config=config, echo=echo)
+        self.client = _get_cerebras_client(config.cerebras_api_key, config.cerebras_base_url)
+        self.async_client = _get_async_cerebras_client(config.cerebras_api_key, config.cerebras_base_url)
         self.config = config
         self.last_stream_printed = False
         self._inside_think = False
+        self._out_buf = []
+        self._tts_queue = tts_queue
+        self._converted = {}
 
     @property
     def _llm_type(self) -> str:
         return "cerebras-langchain-chat"
 
     def _filter_think_text(self, text: str) -> str:
+        """Strip <think>...</think> regions, handling tags split across stream chunks."""
         if not text:
             return ""
-        output_chars: List[str] = []
-        i = 0
-        while i < len(text):
-            if not self._inside_think and text.startswith("<think>", i):
-                self._inside_think = True
-                i += len("<think>")
-                continue
-            if self._inside_think and text.startswith("</think>", i):
-                self._inside_think = False
-                i += len("</think>")
-                continue
+        buf = self._think_carry + text
+        self._think_carry = ""
+        # Hold back a trailing partial tag ("<th", "</thi") until the next chunk completes it
+        cut = buf.rfind("<")
+        if cut != -1:
+            tail = buf[cut:]
+            if tail not in _THINK_TAGS and any(tag.startswith(tail) for tag in _THINK_TAGS):
+                buf, self._think_carry = buf[:cut], tail
+        parts: List[str] = []
+        pos = 0
+        for match in _THINK_TAG_RE.finditer(buf):
             if not self._inside_think:
-                output_chars.append(text[i])
-            i += 1
-        return "".join(output_chars)
+                parts.append(buf[pos:match.start()])
+            self._inside_think = match.group() == "<think>"
+            pos = match.end()
+        if not self._inside_think:
+            parts.append(buf[pos:])
+        return "".join(parts)
+
+    def _flush_think_carry(self) -> str:
+        """Return any held-back partial tag text once the stream has ended."""
+        tail, self._think_carry = self._think_carry, ""
+        return "" if self._inside_think else tail
 
     def _convert_messages(self, messages: List[BaseMessage]) -> List[dict]:
+        # History is append-only, so each message is converted the first time it
+        # is sent and reused after that. Entries keep the message itself alive so
+        # its id() cannot be recycled, and anything no longer sent is dropped.
+        cached = self._converted
+        converted = {}
         formatted: List[dict] = []
         for message in messages:
-            role = "user"
-            if isinstance(message, SystemMessage):
-                role = "system"
-            elif isinstance(message, AIMessage):
-                role = "assistant"
-            elif isinstance(message, HumanMessage):
-                role = "user"
-            content = message.content
-            if isinstance(content, list):
-                text_fragments: List[str] = []
-                for fragment in content:
-                    if isinstance(fragment, str):
-                        text_fragments.append(fragment)
-                    elif isinstance(fragment, dict) and "text" in fragment:
-                        text_fragments.append(str(fragment["text"]))
-                content = "\n".join(text_fragments)
-            formatted.append({"role": role, "content": str(content)})
+            entry = cached.get(id(message))
+            if entry is None or entry[0] is not message:
+                entry = (message, _convert_message(message))
+            converted[id(message)] = entry
+            formatted.append(entry[1])
+        self._converted = converted
         return formatted
 
+    def _request_kwargs(self, messages: List[BaseMessage]) -> dict:
+        return {
+            "messages": self._convert_messages(messages),
+            "model": self.config.cerebras_model,
+            "stream": True,
+            "max_completion_tokens": self.config.cerebras_max_tokens,
+            "temperature": self.config.cerebras_temperature,
+            "top_p": self.config.cerebras_top_p,
+        }
+
+    def _begin_stream(self) -> None:
+        self.last_stream_printed = False
+        self._inside_think = False
+        self._think_carry = ""
+        self._out_buf = []
+        self._out_len = 0
+
+    def _visible_piece(self, chunk) -> str:
+        """Return the user-visible text in a stream chunk ("" if none)."""
+        try:
+            delta = chunk.choices[0].delta
+            piece = getattr(delta, "content", None)
+        except (AttributeError, IndexError):
+            piece = None
+        if not piece:
+            return ""
+        return self._filter_think_text(piece)
+
+    def _emit(self, text: str, chunks: List[str]) -> str:
+        """Record visible text; return a batch for output/callbacks once enough has built up."""
+        chunks.append(text)
+        if self._tts_queue is not None:
+            self._tts_queue.put(text)
+        self._out_buf.append(text)
+        self._out_len += len(text)
+        if self._out_len >= OUTPUT_BATCH_CHARS or text.endswith(_OUTPUT_BATCH_BOUNDARIES):
+            return self._flush_output()
+        return ""
+
+    def _flush_output(self) -> str:
+        """Write any batched text to the terminal in one call and return it."""
+        if not self._out_buf:
+            return ""
+        batch = "".join(self._out_buf)
+        self._out_buf.clear()
+        self._out_len = 0
+        if self.echo:
+            sys.stdout.write(batch)
+            sys.stdout.flush()
+            self.last_stream_printed = True
+        return batch
+
+    def _queue_filler(self) -> None:
+        """Give the speaker something to say while the model is still thinking."""
+        if self._tts_queue is not None and self.config.tts_filler:
+            # Trailing space lets TTSStreamer cut it as its own sentence right away
+            self._tts_queue.put(random.choice(FILLER_PHRASES) + " ")
+
+    def _end_stream(self) -> None:
+        if self._tts_queue is not None:
+            self._tts_queue.put(None)
+
+    def _build_result(self, chunks: List[str]) -> ChatResult:
+        if self.last_stream_printed:
+            print()
+        text = "".join(chunks).strip()
+        ai_message = AIMessage(content=text)
+        return ChatResult(generations=[ChatGeneration(message=ai_message)])
+
     def _generate(
         self,
         messages: List[BaseMessage],
@@ -478,67 +971,239 @@ class LangChainCerebrasChat(BaseChatModel):
         run_manager: Optional[CallbackManagerForLLMRun] = None,
         **kwargs: object,
     ) -> ChatResult:
-        payload = self._convert_messages(messages)
         _ = stop, kwargs
-        self.last_stream_printed = False
-        self._inside_think = False
+        self._begin_stream()
         stream = None
         chunks: List[str] = []
+        first_token = True
         try:
-            stream = self.client.chat.completions.create(
-                messages=payload,
-                model=self.config.cerebras_model,
-                stream=True,
-                max_completion_tokens=self.config.cerebras_max_tokens,
-                temperature=self.config.cerebras_temperature,
-                top_p=self.config.cerebras_top_p,
-            )
+            stream = self.client.chat.completions.create(**self._request_kwargs(messages))
             for chunk in stream:
-                try:
-                    delta = chunk.choices[0].delta
-                    piece = getattr(delta, "content", None)
-                except (AttributeError, IndexError):
-                    piece = None
-                if not piece:
-                    continue
-                filtered = self._filter_think_text(piece)
+                if first_token:
+                    first_token = False
+                    self._queue_filler()
+                filtered = self._visible_piece(chunk)
                 if not filtered:
                     continue
-                print(filtered, end="", flush=True)
-                chunks.append(filtered)
-                self.last_stream_printed = True
-                if run_manager is not None:
-                    run_manager.on_llm_new_token(filtered)
+                batch = self._emit(filtered, chunks)
+                if batch and run_manager is not None:
+                    run_manager.on_llm_new_token(batch)
+            tail = self._flush_think_carry()
+            batch = (self._emit(tail, chunks) if tail else "") + self._flush_output()
+            if batch and run_manager is not None:
+                run_manager.on_llm_new_token(batch)
         finally:
+            self._flush_output()
             if stream is not None:
                 closer = getattr(stream, "close", None)
                 if callable(closer):
                     closer()
-        if self.last_stream_printed:
-            print()
-        text = "".join(chunks).strip()
-        ai_message = AIMessage(content=text)
-        return ChatResult(generations=[ChatGeneration(message=ai_message)])
+            self._end_stream()
+        return self._build_result(chunks)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        _ = stop, kwargs
+        self._begin_stream()
+        stream = None
+        chunks: List[str] = []
+        first_token = True
+        try:
+            stream = await self.async_client.chat.completions.create(**self._request_kwargs(messages))
+            async for chunk in stream:
+                if first_token:
+                    first_token = False
+                    self._queue_filler()
+                filtered = self._visible_piece(chunk)
+                if not filtered:
+                    continue
+                batch = self._emit(filtered, chunks)
+                if batch and run_manager is not None:
+                    await run_manager.on_llm_new_token(batch)
+            tail = self._flush_think_carry()
+            batch = (self._emit(tail, chunks) if tail else "") + self._flush_output()
+            if batch and run_manager is not None:
+                await run_manager.on_llm_new_token(batch)
+        finally:
+            self._flush_output()
+            if stream is not None:
+                closer = getattr(stream, "close", None)
+                if callable(closer):
+                    result = closer()
+                    if inspect.isawaitable(result):
+                        await result
+            self._end_stream()
+        return self._build_result(chunks)
+
+
+# ========== SEMANTIC RESPONSE CACHE ==========
+@dataclass
+class CacheKey:
+    embedding: "np.ndarray"
+    context_hash: str
+
+
+class SemanticCache:
+    """Reuse tutor answers for near-duplicate questions asked in the same context.
+
+    Utterances are embedded with MiniLM and searched in a FAISS inner-product
+    index (cosine, since embeddings are normalized). A hit also requires the
+    session mode, the system messages (instruction and running summary) and the
+    trailing history to match, so context-dependent answers are not replayed
+    into a different conversation.
+    """
+
+    def __init__(self, path: str) -> None:
+        import faiss
+        import numpy
+        from sentence_transformers import SentenceTransformer
+
+        self._faiss = faiss
+        self._np = numpy
+        self.path = path
+        self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        self.index = faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension())
+        self.entries: List[Tuple[str, str]] = []  # (context_hash, response) per index row
+        self._load()
+
+    def key(self, messages: Sequence[BaseMessage], session_mode: str) -> CacheKey:
+        """Key the last message in ``messages`` by its embedding and everything it depends on."""
+        embedding = self.model.encode(
+            [str(messages[-1].content).strip().lower()], normalize_embeddings=True
+        ).astype(self._np.float32)
+        prior = messages[:-1]
+        context = [msg for msg in prior if isinstance(msg, SystemMessage)]
+        context += [msg for msg in prior if not isinstance(msg, SystemMessage)][-SEMANTIC_CACHE_CONTEXT_MESSAGES:]
+        text = "\n".join([session_mode, *(str(msg.content) for msg in context)])
+        return CacheKey(embedding, hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        if not self.entries:
+            return None
+        scores, ids = self.index.search(key.embedding, min(5, len(self.entries)))
+        for score, idx in zip(scores[0], ids[0]):
+            if score < SEMANTIC_CACHE_THRESHOLD:
+                break
+            context_hash, response = self.entries[idx]
+            if context_hash == key.context_hash:
+                return response
+        return None
+
+    def put(self, key: CacheKey, response: str) -> None:
+        self.index.add(key.embedding)
+        self.entries.append((key.context_hash, response))
+
+    def save(self) -> None:
+        if not self.entries:
+            return
+        embeddings = self.index.reconstruct_n(0, self.index.ntotal)
+        with open(self.path, "wb") as fh:
+            pickle.dump({"embeddings": embeddings, "entries": self.entries}, fh)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as fh:
+                data = pickle.load(fh)
+            self.index.add(data["embeddings"])
+            self.entries = list(data["entries"])
+        except Exception as exc:
+            print(f"⚠️ Could not load semantic cache: {exc}", file=sys.stderr)
 
 
 # ========== CONVERSATION LOOP ==========
+@dataclass
+class _Speculation:
+    """An LLM call started on a partial transcript, buffering its output until confirmed."""
+
+    prompt: str
+    pieces: "queue.Queue[Optional[str]]"
+    task: asyncio.Task
+
+
 class ConversationLoop:
     def __init__(self, config: Config) -> None:
         self.config = config
-        self.stt = SpeechRecognizer(config)
+        if config.stt_backend == "vosk":
+            self.stt = LocalStreamingSTT(config)
+        else:
+            self.stt = SpeechRecognizer(config)
         self.tts = TextToSpeechEngine()
-        self.llm = LangChainCerebrasChat(config)
-        self.history: List[BaseMessage] = []
-        if config.system_instruction:
-            self.history.append(SystemMessage(content=config.system_instruction))
+        self.streamer = TTSStreamer(self.tts)
+        self.llm = LangChainCerebrasChat(config, tts_queue=self.streamer.queue)
+        # Summaries are printed, not spoken, so they use a small model without a TTS queue
+        self.summarizer = LangChainCerebrasChat(
+            replace(config, cerebras_model=config.summary_model, cerebras_max_tokens=DEFAULT_SUMMARY_MAX_TOKENS)
+        )
+        # Only the last few exchanges are resent verbatim; older ones live in the running summary
+        self.history: Deque[BaseMessage] = deque(maxlen=2 * config.history_max_turns)
+        self._system_msg = SystemMessage(content=config.system_instruction) if config.system_instruction else None
+        self._running_summary = ""
+        self.cache: Optional[SemanticCache] = None
+        if config.semantic_cache:
+            try:
+                self.cache = SemanticCache(config.semantic_cache_path)
+            except ImportError as exc:
+                print(f"⚠️ Semantic cache disabled (pip install sentence-transformers faiss-cpu): {exc}", file=sys.stderr)
         self._running = True
         self.exchange_count = 0
         self.topics_covered: List[str] = []
+        self._interrupted = threading.Event()
+        self._speculate = config.speculative_llm and isinstance(self.stt, LocalStreamingSTT)
+        self._speculation: Optional[_Speculation] = None
+        self._speculation_timer: Optional[asyncio.TimerHandle] = None
+        if config.barge_in:
+            threading.Thread(target=self._barge_in_monitor, daemon=True).start()
 
     def stop(self) -> None:
         self._running = False
 
-    def run(self) -> None:
+    def close(self) -> None:
+        """Persist anything worth keeping across sessions."""
+        if self.cache is not None:
+            self.cache.save()
+
+    def _barge_in_monitor(self) -> None:
+        """Watch the microphone while the tutor speaks and cut speech if the student talks over it."""
+        try:
+            import numpy
+            import sounddevice
+        except ImportError as exc:
+            print(f"⚠️ Barge-in disabled (needs numpy + sounddevice): {exc}", file=sys.stderr)
+            return
+
+        loud_frames = 0
+        barged_in = threading.Event()
+
+        def _callback(indata, _frames, _time, status) -> None:
+            nonlocal loud_frames
+            if not self.tts.speaking:
+                loud_frames = 0
+                return
+            rms = numpy.sqrt(numpy.mean(indata.astype(numpy.float32) ** 2))
+            loud_frames = loud_frames + 1 if rms > self.config.barge_in_threshold else 0
+            if loud_frames >= BARGE_IN_FRAMES:
+                loud_frames = 0
+                self._interrupted.set()
+                barged_in.set()  # Cancelling kills a subprocess; keep that out of the audio callback
+
+        try:
+            with sounddevice.InputStream(samplerate=16000, blocksize=320, channels=1, dtype='int16', callback=_callback):
+                while self._running:
+                    if barged_in.wait(0.1):
+                        barged_in.clear()
+                        self.streamer.cancel()
+        except Exception as exc:
+            print(f"⚠️ Barge-in monitor stopped: {exc}", file=sys.stderr)
+
+    async def run(self) -> None:
+        """Run the conversation as concurrent STT and LLM->TTS tasks joined by a queue."""
         print("🎧 Voice chat ready.")
         print(f"📚 Session Mode: {self.config.session_mode.upper().replace('_', ' ')}")
         print(f"⏱️  Silence threshold: {self.config.silence_threshold} seconds")
@@ -548,63 +1213,225 @@ class ConversationLoop:
         if self.config.initial_prompt:
             print(f"AI: {self.config.initial_prompt}\n")
             self.tts.speak(self.config.initial_prompt)
+            await asyncio.to_thread(self.streamer.wait)
         
+        utterances: "asyncio.Queue[str]" = asyncio.Queue()
+        ready_to_listen = asyncio.Event()
+        ready_to_listen.set()
+        tasks = [
+            asyncio.create_task(self._stt_task(utterances, ready_to_listen)),
+            asyncio.create_task(self._llm_task(utterances, ready_to_listen)),
+            asyncio.create_task(self._watch_stop()),
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()  # surface unexpected errors
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _watch_stop(self) -> None:
         while self._running:
-            utterance = self.stt.listen()
+            await asyncio.sleep(0.1)
+
+    async def _stt_task(self, utterances: "asyncio.Queue[str]", ready_to_listen: asyncio.Event) -> None:
+        while self._running:
+            # Keep the mic closed while the tutor is talking (barge-in cuts that short)
+            await ready_to_listen.wait()
+            if self._speculate:
+                utterance = await self._listen_with_speculation()
+            else:
+                utterance = await _run_in_daemon_thread(self.stt.listen)
             if not utterance:
+                self._discard_speculation()
                 continue
-            normalized = utterance.lower()
-            print(f"\nStudent (you): {utterance}")
-            
-            if normalized in self.config.exit_phrases:
-                self._say_goodbye()
-                break
-            
-            human_msg = HumanMessage(content=utterance)
-            messages = [*self.history, human_msg]
-            
+            ready_to_listen.clear()
+            await utterances.put(utterance)
+
+    async def _llm_task(self, utterances: "asyncio.Queue[str]", ready_to_listen: asyncio.Event) -> None:
+        while self._running:
+            utterance = await utterances.get()
+            try:
+                if not await self._handle_turn(utterance):
+                    return
+            finally:
+                ready_to_listen.set()
+
+    async def _listen_with_speculation(self) -> Optional[str]:
+        loop = asyncio.get_running_loop()
+
+        def _on_partial(hypothesis: str) -> None:
+            loop.call_soon_threadsafe(self._on_partial, hypothesis)
+
+        try:
+            return await _run_in_daemon_thread(lambda: self.stt.listen(on_partial=_on_partial))
+        finally:
+            if self._speculation_timer is not None:
+                self._speculation_timer.cancel()
+                self._speculation_timer = None
+
+    def _on_partial(self, hypothesis: str) -> None:
+        # Restart the stability timer every time the hypothesis changes
+        if self._speculation_timer is not None:
+            self._speculation_timer.cancel()
+        self._speculation_timer = asyncio.get_running_loop().call_later(
+            SPECULATION_STABLE_SECONDS, self._start_speculation, hypothesis
+        )
+
+    def _start_speculation(self, hypothesis: str) -> None:
+        self._speculation_timer = None
+        if len(hypothesis) <= SPECULATION_MIN_CHARS:
+            return
+        if self._speculation is not None and self._speculation.prompt == hypothesis:
+            return
+        self._discard_speculation()
+        pieces: "queue.Queue[Optional[str]]" = queue.Queue()
+        # Output is buffered, not printed or spoken, until the final transcript confirms it
+        llm = LangChainCerebrasChat(self.config, tts_queue=pieces, echo=False)
+        messages = self._build_messages(HumanMessage(content=hypothesis))
+        self._speculation = _Speculation(hypothesis, pieces, asyncio.create_task(llm.ainvoke(messages)))
+
+    def _discard_speculation(self) -> None:
+        if self._speculation is not None:
+            self._speculation.task.cancel()  # closes the HTTP stream in _agenerate's finally
+            self._speculation = None
+
+    def _claim_speculation(self, utterance: str) -> Optional[_Speculation]:
+        """Return the running speculation if it was started on (nearly) this utterance."""
+        spec, self._speculation = self._speculation, None
+        if spec is None:
+            return None
+        final = utterance.strip().lower()
+        guess = spec.prompt.strip().lower()
+        keep = max(len(guess) - SPECULATION_TOLERANCE, 0)
+        if abs(len(final) - len(guess)) <= SPECULATION_TOLERANCE and final[:keep] == guess[:keep]:
+            return spec
+        spec.task.cancel()
+        return None
+
+    async def _finish_speculation(self, spec: _Speculation) -> BaseMessage:
+        """Stream the buffered speculative answer to TTS and await the rest of it."""
+
+        def _forward() -> None:
+            while True:
+                piece = spec.pieces.get()
+                self.streamer.queue.put(piece)
+                if piece is None:
+                    return
+
+        forwarder = asyncio.create_task(asyncio.to_thread(_forward))
+        try:
+            return await spec.task
+        finally:
+            spec.pieces.put(None)  # in case the call failed before its stream ended
+            await forwarder
+
+    async def _handle_turn(self, utterance: str) -> bool:
+        """Answer one utterance; return False when the student wants to stop."""
+        normalized = utterance.lower()
+        print(f"\nStudent (you): {utterance}")
+        
+        if normalized in self.config.exit_phrases:
+            self._discard_speculation()
+            await asyncio.to_thread(self._say_goodbye)
+            return False
+        
+        human_msg = HumanMessage(content=utterance)
+        messages = self._build_messages(human_msg)
+        cache_key = cached = None
+        if self.cache is not None:
+            # Embedding takes tens of milliseconds; keep it off the event loop
+            cache_key = await asyncio.get_running_loop().run_in_executor(
+                None, self.cache.key, messages, self.config.session_mode
+            )
+            cached = self.cache.get(cache_key)
+        
+        if cached is not None:
+            self._discard_speculation()
+            ai_message = AIMessage(content=cached)
+            streamed = False
+            self.streamer.queue.put(cached)
+            self.streamer.queue.put(None)
+            await asyncio.to_thread(self.streamer.wait)
+        else:
+            speculation = self._claim_speculation(utterance)
             try:
-                ai_message = self.llm.invoke(messages)
+                if speculation is not None:
+                    ai_message = await self._finish_speculation(speculation)
+                else:
+                    # Tokens flow to the TTS streamer while they arrive
+                    ai_message = await self.llm.ainvoke(messages)
             except Exception as exc:
                 print(f"[Cerebras error] {exc}", file=sys.stderr)
-                continue
-            
-            response_text = self._extract_text(ai_message)
-            if not response_text:
-                print("Assistant: (no response)")
-                continue
-            
-            # Extract role and clean response
-            role_label, clean_response = self._parse_role_response(response_text)
-            
-            self.history.append(human_msg)
-            self.history.append(ai_message)
-            self.exchange_count += 1
-            
-            if not self.llm.last_stream_printed:
-                print(f"\n{role_label}: {clean_response}")
-            
-            self.tts.speak(clean_response)
-            
-            # Periodic summary
-            if self.exchange_count % SUMMARY_INTERVAL == 0:
-                self._maybe_offer_summary()
+                return True
+            finally:
+                # Wait for the spoken tail so the microphone does not pick up our own voice
+                await asyncio.to_thread(self.streamer.wait)
+            streamed = speculation is None and self.llm.last_stream_printed
+        
+        response_text = self._extract_text(ai_message)
+        if not response_text:
+            print("Assistant: (no response)")
+            return True
+        
+        # Extract role and clean response
+        role_label, clean_response = self._parse_role_response(response_text)
+        
+        if self.cache is not None and cached is None:
+            self.cache.put(cache_key, response_text)
+        self.history.append(human_msg)
+        self.history.append(ai_message)
+        self.exchange_count += 1
+
+        if self._interrupted.is_set():
+            self._interrupted.clear()
+            print("\n⏹️  Interrupted - listening...")
+            return True
+        
+        if not streamed:
+            print(f"\n{role_label}: {clean_response}")
+        
+        # Periodic summary
+        if self.exchange_count % SUMMARY_INTERVAL == 0:
+            await self._maybe_offer_summary()
+        return True
 
     def _say_goodbye(self) -> None:
         """Provide a helpful closing message."""
         farewell = f"Great session! We covered {self.exchange_count} topics together. Keep practicing and feel free to come back anytime. Good luck!"
         print(f"\n{farewell}")
         self.tts.speak(farewell)
-
-    def _maybe_offer_summary(self) -> None:
-        """Optionally summarize the session so far."""
-        summary_msg = HumanMessage(content="[INTERNAL: Briefly summarize our session so far in 1-2 sentences for the student]")
-        messages = [*self.history, summary_msg]
+        self.tts.flush()
+
+    def _build_messages(self, human_msg: HumanMessage) -> List[BaseMessage]:
+        """Assemble the prompt: system instruction, running summary, recent turns, new message."""
+        messages: List[BaseMessage] = []
+        if self._system_msg is not None:
+            messages.append(self._system_msg)
+        if self._running_summary:
+            messages.append(SystemMessage(content=f"Summary of earlier: {self._running_summary}"))
+        messages.extend(self.history)
+        messages.append(human_msg)
+        return messages
+
+    async def _maybe_offer_summary(self) -> None:
+        """Refresh the running summary with the small model and show it to the student."""
+        transcript = "\n".join(
+            f"{'Student' if isinstance(msg, HumanMessage) else 'Tutor'}: {self._extract_text(msg)}"
+            for msg in self.history
+        )
+        if self._running_summary:
+            transcript = f"Earlier summary: {self._running_summary}\n\n{transcript}"
+        messages = [SystemMessage(content=SUMMARY_INSTRUCTION), HumanMessage(content=transcript)]
         
         try:
-            summary_response = self.llm.invoke(messages)
+            summary_response = await self.summarizer.ainvoke(messages)
             summary_text = self._extract_text(summary_response)
             _, clean_summary = self._parse_role_response(summary_text)
+            if clean_summary:
+                self._running_summary = clean_summary
             
             print(f"\n📊 Session Summary: {clean_summary}\n")
         except Exception:
@@ -613,13 +1440,10 @@ class ConversationLoop:
     def _parse_role_response(self, text: str) -> Tuple[str, str]:
         """Extract role tag and return (role_label, clean_text)."""
         text = text.strip()
-        
-        if text.startswith("[Expert]"):
-            return "🎓 Expert", text[8:].strip()
-        elif text.startswith("[TA]"):
-            return "👨‍🏫 TA", text[4:].strip()
-        else:
-            return "🤖 Assistant", text
+        match = _ROLE_PREFIX_RE.match(text)
+        if match:
+            return _ROLE_LABELS[match.group(1)], text[match.end():]
+        return "🤖 Assistant", text
 
     @staticmethod
     def _extract_text(message: BaseMessage) -> str:
@@ -638,6 +1462,31 @@ class ConversationLoop:
 
 
 # ========== SIGNAL HANDLERS + MAIN ==========
+async def _run_in_daemon_thread(fn):
+    """Like asyncio.to_thread, but on a daemon thread so a blocked mic read never stalls shutdown."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def _resolve(setter, value) -> None:
+        if not future.done():
+            setter(value)
+
+    def _target() -> None:
+        try:
+            result = fn()
+        except BaseException as exc:
+            callback, value = future.set_exception, exc
+        else:
+            callback, value = future.set_result, result
+        try:
+            loop.call_soon_threadsafe(_resolve, callback, value)
+        except RuntimeError:
+            pass  # Event loop already closed
+
+    threading.Thread(target=_target, daemon=True).start()
+    return await future
+
+
 def _install_signal_handlers(loop: ConversationLoop) -> None:
     def _handler(signum, _frame) -> None:
         print(f"\nReceived signal {signum}. Exiting...", file=sys.stderr)
@@ -653,11 +1502,12 @@ def main() -> None:
     loop = ConversationLoop(config)
     _install_signal_handlers(loop)
     try:
-        loop.run()
+        asyncio.run(loop.run())
     except KeyboardInterrupt:
         print("\nInterrupted by user.", file=sys.stderr)
     finally:
         loop.stop()
+        loop.close()
         time.sleep(0.2)
 
 
@@ -1,7 +1,12 @@
 """LangChain agent for chat with streaming using Cerebras."""
+import asyncio
 import os
-from typing import AsyncGenerator, Optional
+import pickle
+import threading
+import weakref
+from typing import AsyncGenerator, Optional, Protocol
 import logging
+from cachetools import TTLCache
 from langchain_cerebras import ChatCerebras
 from langchain.memory import ConversationBufferMemory
 from langchain.schema import HumanMessage, AIMessage
@@ -9,8 +14,85 @@ from langchain.schema import HumanMessage, AIMessage
 
 logger = logging.getLogger(__name__)
 
-# In-memory session storage (use Redis in production)
-_session_memories = {}
+SESSION_MAX = int(os.getenv("SESSION_MAX", "1000"))
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))
+
+
+class CacheBackend(Protocol):
+    """Storage for per-session conversation memory."""
+
+    def get(self, session_id: str) -> Optional[ConversationBufferMemory]: ...
+
+    def set(self, session_id: str, memory: ConversationBufferMemory) -> None: ...
+
+    def delete(self, session_id: str) -> bool: ...
+
+
+class InMemoryBackend:
+    """Process-local store; idle sessions expire after the TTL, oldest evicted past maxsize."""
+
+    def __init__(self, maxsize: int, ttl: int) -> None:
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[ConversationBufferMemory]:
+        with self._lock:
+            return self._cache.get(session_id)
+
+    def set(self, session_id: str, memory: ConversationBufferMemory) -> None:
+        with self._lock:
+            self._cache[session_id] = memory
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._cache.pop(session_id, None) is not None
+
+
+class RedisBackend:
+    """Shared store so several server processes can serve the same session."""
+
+    def __init__(self, url: str, ttl: int) -> None:
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._ttl = ttl
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"parley:sess:{session_id}"
+
+    def get(self, session_id: str) -> Optional[ConversationBufferMemory]:
+        raw = self._client.get(self._key(session_id))
+        return pickle.loads(raw) if raw else None
+
+    def set(self, session_id: str, memory: ConversationBufferMemory) -> None:
+        self._client.set(self._key(session_id), pickle.dumps(memory), ex=self._ttl)
+
+    def delete(self, session_id: str) -> bool:
+        return bool(self._client.delete(self._key(session_id)))
+
+
+def _make_backend() -> CacheBackend:
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        return RedisBackend(redis_url, SESSION_TTL)
+    return InMemoryBackend(SESSION_MAX, SESSION_TTL)
+
+
+# Session storage: bounded in-memory TTL cache, or Redis when REDIS_URL is set
+_session_memories: CacheBackend = _make_backend()
+# One lock per live session so concurrent requests cannot interleave its history
+_session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _session_lock(session_id: Optional[str]) -> asyncio.Lock:
+    if not session_id:
+        return asyncio.Lock()
+    lock = _session_locks.get(session_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _session_locks[session_id] = lock
+    return lock
 
 
 async def run_chat_stream(
@@ -37,37 +119,37 @@ async def run_chat_stream(
             cerebras_api_key=os.getenv("CEREBRAS_API_KEY")
         )
         
-        # Get or create conversation memory
-        if session_id and session_id in _session_memories:
-            memory = _session_memories[session_id]
-        else:
-            memory = ConversationBufferMemory(
-                memory_key="chat_history",
-                return_messages=True
-            )
+        async with _session_lock(session_id):
+            # Get or create conversation memory
+            memory = _session_memories.get(session_id) if session_id else None
+            if memory is None:
+                memory = ConversationBufferMemory(
+                    memory_key="chat_history",
+                    return_messages=True
+                )
+            
+            # Build message list with conversation history
+            messages = []
+            
+            # Add conversation history from memory
+            if memory.chat_memory.messages:
+                messages.extend(memory.chat_memory.messages)
+            
+            # Add current user message
+            messages.append(HumanMessage(content=user_input))
+            
+            # Stream response
+            response = ""
+            async for chunk in llm.astream(messages):
+                if chunk.content:
+                    response += chunk.content
+                    yield f"data: {chunk.content}\n\n"
+            
+            # Save conversation to memory (re-store so TTL and remote copies refresh)
+            memory.chat_memory.add_user_message(user_input)
+            memory.chat_memory.add_ai_message(response)
             if session_id:
-                _session_memories[session_id] = memory
-        
-        # Build message list with conversation history
-        messages = []
-        
-        # Add conversation history from memory
-        if memory.chat_memory.messages:
-            messages.extend(memory.chat_memory.messages)
-        
-        # Add current user message
-        messages.append(HumanMessage(content=user_input))
-        
-        # Stream response
-        response = ""
-        async for chunk in llm.astream(messages):
-            if chunk.content:
-                response += chunk.content
-                yield f"data: {chunk.content}\n\n"
-        
-        # Save conversation to memory
-        memory.chat_memory.add_user_message(user_input)
-        memory.chat_memory.add_ai_message(response)
+                _session_memories.set(session_id, memory)
         
         yield "data: [DONE]\n\n"
         
@@ -79,15 +161,12 @@ async def run_chat_stream(
 
 def clear_session_memory(session_id: str) -> bool:
     """Clear conversation memory for a session."""
-    if session_id in _session_memories:
-        del _session_memories[session_id]
-        return True
-    return False
+    return _session_memories.delete(session_id)
 
 
 def get_session_history(session_id: str) -> list:
     """Get conversation history for a session."""
-    if session_id in _session_memories:
-        memory = _session_memories[session_id]
+    memory = _session_memories.get(session_id)
+    if memory is not None:
         return memory.chat_memory.messages
     return []
\ No newline at end of file
@@ -1,6 +1,5 @@
-def get_system_prompt():
-    """System prompt - used once at initialization"""
-    return f"""You are an adaptive educational AI tutor helping students learn through the Feynman Technique.
+# System prompt - used once at initialization
+SYSTEM_PROMPT = """You are an adaptive educational AI tutor helping students learn through the Feynman Technique.
 The user is ALWAYS the Student. The goal is to create a podcast/ casual conversation between a TA, an expert(professor), and the user.
 You will switch roles appropriately based on the context of the conversation.
 DO NOT USE EMOJIS.
@@ -116,9 +115,8 @@ Use memory to personalize each new response.
 [TA] Totally fine — it’s easy to overthink this. Let’s try a different route: think of isolating x like unpacking layers. Which part would you remove first?"""
 
 
-def get_iterative_prompt():
-    """Iterative prompt - used per turn"""
-    return  f"""
+# Iterative prompt - used per turn
+ITERATIVE_PROMPT = """
 You are an adaptive AI tutor using the Feynman Technique to teach astudent.
 DO NOT USE EMOJIS
 
@@ -145,3 +143,13 @@ Keep response under 50 words total.
 (Optional direct question to Student)
 
 """
+
+
+def get_system_prompt():
+    """System prompt - used once at initialization"""
+    return SYSTEM_PROMPT
+
+
+def get_iterative_prompt():
+    """Iterative prompt - used per turn"""
+    return ITERATIVE_PROMPT
@@ -5,22 +5,41 @@ Endpoints:
     POST /api/start-conversation - Initialize conversation with PDF context
     POST /api/listen         - Capture voice input from microphone
     POST /api/send-message   - Send message to Cerebras and get response
+                               ({"async": true} returns 202 and emits message_ready)
     GET  /api/conversation-history - Get current conversation history
     POST /api/reset          - Reset conversation state
+
+Spoken audio for start-conversation/send-message replies is not part of the HTTP
+response; it is pushed to the session's Socket.IO room as an ``audio_ready`` event.
 """
 
 from flask import Flask, request, jsonify, session
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room
 
 from werkzeug.utils import secure_filename
+import functools
+import hashlib
+import importlib.util
+from concurrent.futures import Future, ThreadPoolExecutor
 import os
+import queue
+import re
 import sys
 import tempfile
 import threading
-from typing import Optional, Dict, List
+import time
+import zlib
+from typing import Any, Callable, Optional, Dict, List
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
 # Import from speech.py
 from speech import (
     Config,
@@ -28,9 +47,8 @@ from speech import (
     TextToSpeechEngine,
     LangChainCerebrasChat,
 )
-from prompt import get_iterative_prompt, get_system_prompt
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, BaseMessage
-from prompts import get_system_prompt, get_iterative_prompt
+from prompts import ITERATIVE_PROMPT, SYSTEM_PROMPT
 load_dotenv('.env.local')
 
 VOICE_IO_ENABLED = os.getenv('ENABLE_SERVER_VOICE', 'false').lower() == 'true'
@@ -38,6 +56,29 @@ VOICE_IO_ENABLED = os.getenv('ENABLE_SERVER_VOICE', 'false').lower() == 'true'
 app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
 
+if orjson is not None:
+    class OrjsonProvider(DefaultJSONProvider):
+        """Flask JSON provider backed by orjson (several times faster than stdlib json)."""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    class _OrjsonSocketIOJson:
+        """json-module shim for Socket.IO packet encoding."""
+
+        @staticmethod
+        def dumps(obj, *args, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        @staticmethod
+        def loads(s, *args, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
+
 # Configure session cookies
 app.config['SESSION_COOKIE_SAMESITE'] = 'None'
 app.config['SESSION_COOKIE_SECURE'] = False  # Set to True in production with HTTPS
@@ -60,19 +101,224 @@ socketio = SocketIO(
     cors_allowed_origins=allowed_origins,
     async_mode='threading',
     logger=True,
-    engineio_logger=False
+    engineio_logger=False,
+    **({'json': _OrjsonSocketIOJson} if orjson is not None else {})
 )
 
+# Per-turn guidance, built once and shared by every request
+ITERATIVE_GUIDANCE_MSG = SystemMessage(content=ITERATIVE_PROMPT)
+
+# PDFs longer than PDF_TOP_K chunks are retrieved per turn instead of sent whole
+PDF_CHUNK_CHARS = 2000  # roughly 512 tokens of prose
+PDF_TOP_K = int(os.getenv('PDF_TOP_K', '6'))
+# Streamed text is sent to the client in ai_chunk events of about this many chars
+AI_CHUNK_EMIT_CHARS = 64
+# Streamed replies are synthesized one sentence at a time
+_SENTENCE_END_RE = re.compile(r"[.!?]+(?=\s)|\n")
+# Exchanges kept verbatim after the system prefix; older ones are dropped
+MAX_HISTORY_TURNS = int(os.getenv('MAX_HISTORY_TURNS', '20'))
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+_HAS_SENTENCE_TRANSFORMERS = importlib.util.find_spec("sentence_transformers") is not None
+
+# Bounded pool for server-side speech, instead of a new thread per response
+TTS_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv('TTS_WORKERS', '4')), thread_name_prefix='tts')
+
+SESSION_MAX = int(os.getenv('SESSION_MAX', '1000'))
+SESSION_TTL = int(os.getenv('SESSION_TTL', '3600'))
+
+
+class SessionStore(TTLCache):
+    """Thread-safe TTL/LRU store whose entries expire after SESSION_TTL seconds idle.
+
+    Reading an entry re-inserts it, so active sessions stay alive while
+    abandoned ones (and their PDFs) are evicted. ``on_evict`` is called with
+    every value that leaves the store: expired, evicted, deleted or replaced.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = SESSION_MAX,
+        ttl: int = SESSION_TTL,
+        on_evict: Optional[Callable[[Any], None]] = None,
+        timer: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(maxsize=maxsize, ttl=ttl, timer=timer)
+        self._lock = threading.RLock()
+        self._on_evict = on_evict
+
+    def _evicted(self, value) -> None:
+        if self._on_evict is not None:
+            self._on_evict(value)
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = super().__getitem__(key)
+            super().__setitem__(key, value)
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            try:
+                old = super().__getitem__(key)
+            except KeyError:
+                old = None
+            super().__setitem__(key, value)
+            if old is not None and old is not value:
+                self._evicted(old)
+
+    def __delitem__(self, key):
+        with self._lock:
+            value = super().__getitem__(key)
+            super().__delitem__(key)
+            self._evicted(value)
+
+    def expire(self, time=None):
+        with self._lock:
+            expired = super().expire(time)
+            for _key, value in expired:
+                self._evicted(value)
+            return expired
+
+    def __contains__(self, key):
+        with self._lock:
+            return super().__contains__(key)
+
+
 # Global state (in production, use Redis or similar)
-conversations: Dict[str, Dict] = {}
-pdf_storage: Dict[str, str] = {}  # Store PDF text by session_id
+conversations: SessionStore = SessionStore(on_evict=lambda conv: conv.close())
+pdf_storage: SessionStore = SessionStore()  # Store pdf_key() of the uploaded text by session_id
+
+# Per-document state shared by every session that opens the same PDF, keyed by pdf_key()
+_PDF_BLOBS: SessionStore = SessionStore()  # zlib-compressed text, one copy per document
+_BUILT_PROMPT_CACHE: SessionStore = SessionStore()
+_RETRIEVER_CACHE: SessionStore = SessionStore()
+
+
+def pdf_key(pdf_text: str) -> str:
+    """Content hash identifying a document across uploads and sessions."""
+    return hashlib.blake2b(pdf_text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def store_pdf_text(pdf_text: str) -> str:
+    """Keep one compressed copy of ``pdf_text`` (prose shrinks 3-5x) and return its key."""
+    key = pdf_key(pdf_text)
+    blob = _PDF_BLOBS.get(key)
+    _PDF_BLOBS[key] = blob if blob is not None else zlib.compress(pdf_text.encode('utf-8'), 6)
+    return key
+
+
+def load_pdf_text(session_id: Optional[str]) -> str:
+    """Decompress the PDF text uploaded for ``session_id``, or '' if there is none."""
+    key = pdf_storage.get(session_id) if session_id else None
+    blob = _PDF_BLOBS.get(key) if key else None
+    return zlib.decompress(blob).decode('utf-8') if blob is not None else ''
+
+@functools.lru_cache(maxsize=1)
+def _get_embedder():
+    """Load the embedding model once per process, on first use."""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
+def _chunk_text(text: str, size: int = PDF_CHUNK_CHARS) -> List[str]:
+    """Split text into chunks of about ``size`` chars along paragraph breaks."""
+    chunks: List[str] = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        paragraph = paragraph.strip()
+        # Paragraphs longer than a chunk are cut into chunk-sized slices
+        for start in range(0, len(paragraph), size):
+            piece = paragraph[start:start + size]
+            if current and len(current) + len(piece) + 2 > size:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class PdfRetriever:
+    """Top-K retrieval over a PDF's chunks, embedded once per session."""
+
+    def __init__(self, pdf_text: str):
+        self.chunks = _chunk_text(pdf_text)
+        self.embedder = _get_embedder()
+        self.embeddings = self.embedder.encode(self.chunks, normalize_embeddings=True)
+
+    def context_message(self, query: str, k: int = PDF_TOP_K) -> SystemMessage:
+        """Return the chunks most similar to ``query`` as a tail system message."""
+        query_vec = self.embedder.encode([query], normalize_embeddings=True)[0]
+        scores = self.embeddings @ query_vec
+        # Keep document order so the same chunk set always renders identically
+        top = sorted(scores.argsort()[::-1][:k].tolist())
+        material = "\n\n".join(self.chunks[i] for i in top)
+        return SystemMessage(
+            content=f"=== RELEVANT STUDY MATERIAL ===\n{material}\n\n=== END MATERIAL ===\n\nUse this material to guide your tutoring."
+        )
+
+
+class SentenceAudioStream:
+    """Synthesize a streamed reply sentence by sentence, emitting audio_chunk events in order.
+
+    Sentences are synthesized concurrently on TTS_EXECUTOR; a background task
+    waits on the futures in submission order so clients can play chunks as
+    they arrive. Each chunk carries ``message_id`` so clients can match it to
+    its reply. Call ``close`` once the reply has finished streaming.
+    """
+
+    def __init__(self, conv: "ConversationSession", message_id: str):
+        self.conv = conv
+        self.message_id = message_id
+        self.enabled = bool(conv.tts)
+        self._buffer = ""
+        self._futures: "queue.Queue[Optional[Future]]" = queue.Queue()
+        if self.enabled:
+            socketio.start_background_task(self._emit_in_order)
+
+    def feed(self, text: str) -> None:
+        if not self.enabled:
+            return
+        self._buffer += text
+        match = _SENTENCE_END_RE.search(self._buffer)
+        while match:
+            self._submit(self._buffer[:match.end()])
+            self._buffer = self._buffer[match.end():]
+            match = _SENTENCE_END_RE.search(self._buffer)
+
+    def close(self) -> None:
+        if not self.enabled:
+            return
+        self.enabled = False  # Later feed/close calls are no-ops
+        self._submit(self._buffer)
+        self._buffer = ""
+        self._futures.put(None)
+
+    def _submit(self, sentence: str) -> None:
+        if sentence.strip():
+            self._futures.put(TTS_EXECUTOR.submit(self.conv.build_audio_payload, sentence))
+
+    def _emit_in_order(self) -> None:
+        index = 0
+        while True:
+            future = self._futures.get()
+            if future is None:
+                return
+            payload = future.result()  # build_audio_payload logs failures and returns None
+            if payload:
+                socketio.emit('audio_chunk', {**payload, 'index': index, 'messageId': self.message_id},
+                              room=self.conv.session_id)
+                index += 1
+
 
 class ConversationSession:
     """Manages a single conversation session with Cerebras."""
     
     def __init__(self, session_id: str, pdf_text: str = ""):
         self.session_id = session_id
-        self.pdf_text = pdf_text
+        # Only the key is kept: the text lives once, compressed, in _PDF_BLOBS and the
+        # built prompt / retriever are shared through their caches
+        self.pdf_key = pdf_key(pdf_text) if pdf_text else ""
         self.config = Config()
         self.config.validate()
         # self.isfirst = True
@@ -89,24 +335,48 @@ class ConversationSession:
         # Conversation history
         self.history: List[BaseMessage] = []
         
-        # Build system prompt with PDF context
-        system_prompt = self._build_system_prompt()
-        self.history.append(SystemMessage(content=system_prompt))
+        # The base prompt comes first and is identical for every session, so the
+        # provider's prompt cache can share it server-wide; the PDF follows as its
+        # own message (stable within a session). Neither is ever rewritten, and
+        # per-turn content only goes at the tail.
+        self.history.append(SystemMessage(content=self._build_system_prompt()))
+        self.retriever: Optional[PdfRetriever] = None
+        if _HAS_SENTENCE_TRANSFORMERS and len(pdf_text) > PDF_CHUNK_CHARS * PDF_TOP_K:
+            try:
+                self.retriever = _RETRIEVER_CACHE.get(self.pdf_key)
+                if self.retriever is None:
+                    self.retriever = _RETRIEVER_CACHE[self.pdf_key] = PdfRetriever(pdf_text)
+            except Exception as exc:
+                print(f"[PDF] Retrieval unavailable, sending full text: {exc}", file=sys.stderr)
+        material = None if self.retriever else self._build_material_prompt(pdf_text)
+        if material:
+            self.history.append(SystemMessage(content=material))
+        self._prefix_len = len(self.history)
+        # The prefix never changes, so its wire format is computed once per session
+        self._converted_prefix = self.llm._convert_messages(self.history)
+        self._history_cache: Optional[List[Dict]] = None
+        self.turn_lock = threading.Lock()
 
 
     def _build_system_prompt(self) -> str:
-        """Build system prompt including PDF context."""
+        """Build the base system prompt shared by every session."""
         # if self.isfirst:
-        base_prompt = get_system_prompt()
+        base_prompt = SYSTEM_PROMPT
             # self.isfirst = False
         # else:
-        #     base_prompt = get_iterative_prompt()
+        #     base_prompt = ITERATIVE_PROMPT
 
-
-        if self.pdf_text:
-            return f"{base_prompt}\n\n=== STUDY MATERIAL ===\n{self.pdf_text}\n\n=== END MATERIAL ===\n\nUse this material to guide your tutoring."
-        
         return base_prompt
+
+    def _build_material_prompt(self, pdf_text: str) -> Optional[str]:
+        """Build the PDF context message, shared by all sessions on the same document."""
+        if not pdf_text:
+            return None
+        prompt = _BUILT_PROMPT_CACHE.get(self.pdf_key)
+        if prompt is None:
+            prompt = f"=== STUDY MATERIAL ===\n{pdf_text}\n\n=== END MATERIAL ===\n\nUse this material to guide your tutoring."
+            _BUILT_PROMPT_CACHE[self.pdf_key] = prompt
+        return prompt
     
     def _initialize_voice_components(self) -> None:
         """Set up optional speech components."""
@@ -125,6 +395,24 @@ class ConversationSession:
         if not self.stt and not self.tts:
             self.voice_enabled = False
 
+    def context_messages(self, query: str) -> List[BaseMessage]:
+        """Per-turn study material for large PDFs; empty when it is in the prefix."""
+        if not self.retriever:
+            return []
+        try:
+            return [self.retriever.context_message(query)]
+        except Exception as exc:
+            print(f"[PDF] Retrieval failed: {exc}", file=sys.stderr)
+            return []
+
+    def close(self) -> None:
+        """Release the microphone stream; called when the session leaves the store."""
+        if self.stt:
+            try:
+                self.stt.close()
+            except Exception as exc:
+                print(f"[Voice] Failed to close speech recognition: {exc}", file=sys.stderr)
+
     def listen(self) -> Optional[str]:
         """Capture voice input from microphone."""
         if not self.stt:
@@ -135,32 +423,43 @@ class ConversationSession:
         """Send message to Cerebras and get response."""
         human_msg = HumanMessage(content=user_input)
         
-        # Add iterative prompt before user message to guide this turn
-        iterative_guidance = get_iterative_prompt()
-        guidance_msg = SystemMessage(content=iterative_guidance)
-        
-        # Build messages: history + iterative guidance + user message
-        iter_guide = get_iterative_prompt()
-        guidance = SystemMessage(content=iter_guide)
-        messages = [*self.history, guidance_msg, guidance, human_msg]
+        # One turn at a time per conversation, so overlapping requests can't interleave history
+        with self.turn_lock:
+            # Build messages: history + iterative guidance + user message
+            messages = [*self.history, *self.context_messages(user_input), ITERATIVE_GUIDANCE_MSG, human_msg]
 
-        try:
-            ai_message = self.llm.invoke(messages)
-            response_text = self._extract_text(ai_message)
-            
-            if response_text:
-                # Only save user message and AI response to history
-                # Don't save the iterative guidance (it's added fresh each turn)
-                self.history.append(human_msg)
-                self.history.append(ai_message)
-            
-            return response_text
-        except Exception as exc:
-            print(f"[Cerebras error] {exc}", file=sys.stderr)
-            raise
+            try:
+                ai_message = self.llm.invoke(messages)
+                response_text = self._extract_text(ai_message)
+                
+                if response_text:
+                    # Only save user message and AI response to history
+                    # Don't save the iterative guidance (it's added fresh each turn)
+                    self.append_turn(human_msg, ai_message)
+                
+                return response_text
+            except Exception as exc:
+                print(f"[Cerebras error] {exc}", file=sys.stderr)
+                raise
+
+    def request_messages(self, *tail: BaseMessage) -> List[dict]:
+        """Cerebras message dicts for the history plus ``tail``, reusing the converted prefix."""
+        return [
+            *self._converted_prefix,
+            *self.llm._convert_messages([*self.history[self._prefix_len:], *tail]),
+        ]
+
+    def append_turn(self, human_msg: HumanMessage, ai_message: BaseMessage) -> None:
+        """Record an exchange, dropping the oldest ones past MAX_HISTORY_TURNS."""
+        self.history.append(human_msg)
+        self.history.append(ai_message)
+        excess = len(self.history) - self._prefix_len - 2 * MAX_HISTORY_TURNS
+        if excess > 0:
+            del self.history[self._prefix_len:self._prefix_len + excess]
+        self._history_cache = None
 
     def speak_async(self, text: str) -> None:
-        """Speak text using TTS in a background thread."""
+        """Speak text using TTS on the shared worker pool."""
         if not self.tts or not text.strip():
             return
         
@@ -170,7 +469,19 @@ class ConversationSession:
             except Exception as exc:
                 print(f"[Voice] Error during speech synthesis: {exc}", file=sys.stderr)
         
-        threading.Thread(target=_speak, daemon=True).start()
+        TTS_EXECUTOR.submit(_speak)
+
+    def emit_audio_async(self, text: str) -> None:
+        """Synthesize audio off the request path and push it to the session room as audio_ready."""
+        if not self.tts or not text.strip():
+            return
+
+        def _synthesize():
+            payload = self.build_audio_payload(text)
+            if payload:
+                socketio.emit('audio_ready', payload, room=self.session_id)
+
+        TTS_EXECUTOR.submit(_synthesize)
 
     def build_audio_payload(self, text: str) -> Optional[Dict[str, str]]:
         if not self.tts or not text.strip():
@@ -186,7 +497,9 @@ class ConversationSession:
         return {"audioBase64": audio_b64, "audioMimeType": mime_type}
     
     def get_history(self) -> List[Dict]:
-        """Get conversation history as JSON-serializable list."""
+        """Get conversation history as JSON-serializable list (cached until the next turn)."""
+        if self._history_cache is not None:
+            return self._history_cache
         history = []
         for msg in self.history:
             if isinstance(msg, SystemMessage):
@@ -196,13 +509,15 @@ class ConversationSession:
             content = self._extract_text(msg)
             history.append({'role': role, 'content': content})
         
+        self._history_cache = history
         return history
     
     @staticmethod
     def _extract_text(message: BaseMessage) -> str:
         """Extract text content from message."""
         content = getattr(message, "content", "")
-        if isinstance(content, str):
+        # Plain str is by far the common case; exact type check skips the isinstance walk
+        if type(content) is str:
             return content.strip()
         if isinstance(content, list):
             parts: List[str] = []
@@ -215,6 +530,12 @@ class ConversationSession:
         return str(content).strip()
 
 
+def _cached_prompt_tokens(usage) -> Optional[int]:
+    """Prompt tokens served from the provider's prefix cache, if reported."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", None)
+
+
 # ============= API ENDPOINTS =============
 
 @app.route('/api/health', methods=['GET'])
@@ -247,8 +568,8 @@ def upload_pdf():
         # Create session ID
         session_id = os.urandom(16).hex()
         
-        # Store PDF text in memory (not in cookie - too large!)
-        pdf_storage[session_id] = pdf_text
+        # Store compressed PDF text in memory (not in cookie - too large!)
+        pdf_storage[session_id] = store_pdf_text(pdf_text)
         
         # Only store small metadata in session
         session['session_id'] = session_id
@@ -276,11 +597,10 @@ def start_conversation():
     session_id = data.get('sessionId') or session.get('session_id')
     
     # Get PDF text from memory storage
-    pdf_text = pdf_storage.get(session_id, '')
+    pdf_text = load_pdf_text(session_id)
     
     print(f"[DEBUG] Start conversation - session_id: {session_id}")
     print(f"[DEBUG] PDF text length: {len(pdf_text)} bytes")
-    print(f"[DEBUG] PDF storage keys: {list(pdf_storage.keys())}")
     
     if not session_id:
         return jsonify({'error': 'No active session. Upload a PDF first.'}), 400
@@ -295,16 +615,14 @@ def start_conversation():
             "Hello! I've uploaded my study material and I'm ready to learn."
         )
         conv.speak_async(initial_message)
-        audio_payload = conv.build_audio_payload(initial_message) or {}
+        # Audio follows over the socket as audio_ready; don't hold the response for TTS
+        conv.emit_audio_async(initial_message)
         
-        response_body = {
+        return jsonify({
             'success': True,
             'message': initial_message,
             'sessionId': session_id
-        }
-        response_body.update(audio_payload)
-        
-        return jsonify(response_body)
+        })
     
     except Exception as e:
         print(f"Error starting conversation: {e}", file=sys.stderr)
@@ -358,24 +676,42 @@ def send_message():
     
     try:
         conv = conversations[session_id]
+        if data.get('async'):
+            # Don't hold this request thread for the LLM; the reply follows as message_ready
+            socketio.start_background_task(_send_message_in_background, conv, user_input)
+            return jsonify({'success': True, 'pending': True}), 202
+        
         response = conv.send_message(user_input)
         conv.speak_async(response)
-        audio_payload = conv.build_audio_payload(response) or {}
+        conv.emit_audio_async(response)
         
-        response_body = {
+        return jsonify({
             'success': True,
             'response': response,
             'history': conv.get_history()
-        }
-        response_body.update(audio_payload)
-        
-        return jsonify(response_body)
+        })
     
     except Exception as e:
         print(f"Error sending message: {e}", file=sys.stderr)
         return jsonify({'error': str(e)}), 500
 
 
+def _send_message_in_background(conv: ConversationSession, user_input: str) -> None:
+    """Run an async send-message turn and push the result to the session room."""
+    try:
+        response = conv.send_message(user_input)
+    except Exception as e:
+        print(f"Error sending message: {e}", file=sys.stderr)
+        socketio.emit('error', {'message': f'Error generating response: {str(e)}'}, room=conv.session_id)
+        return
+    conv.speak_async(response)
+    conv.emit_audio_async(response)
+    socketio.emit('message_ready', {
+        'response': response,
+        'history': conv.get_history()
+    }, room=conv.session_id)
+
+
 @app.route('/api/conversation-history', methods=['GET'])
 def get_conversation_history():
     """Get current conversation history."""
@@ -442,7 +778,7 @@ def handle_join(data):
     
     # Initialize conversation if needed
     if session_id not in conversations:
-        pdf_text = pdf_storage.get(session_id, '')
+        pdf_text = load_pdf_text(session_id)
         try:
             conversations[session_id] = ConversationSession(session_id, pdf_text)
             print(f'[WebSocket] Created new conversation session: {session_id}')
@@ -479,15 +815,21 @@ def handle_message(data):
     
     # Add user message to history
     human_msg = HumanMessage(content=message)
-    messages = [*conv.history, human_msg]
     
+    # One id for the whole reply: ai_start, every ai_chunk/audio_chunk and ai_complete
+    message_id = os.urandom(8).hex()
+    audio = SentenceAudioStream(conv, message_id)
+    conv.turn_lock.acquire()
     try:
+        messages = conv.request_messages(*conv.context_messages(message), human_msg)
         # Notify client that AI is starting to respond
-        emit('ai_start', {})
+        emit('ai_start', {'messageId': message_id})
+        # Think-filter state is per stream; don't inherit a previous reply's leftovers
+        conv.llm.reset_think_filter()
         
         # Stream response chunks from Cerebras
         stream = conv.llm.client.chat.completions.create(
-            messages=conv.llm._convert_messages(messages),
+            messages=messages,
             model=conv.config.cerebras_model,
             stream=True,
             max_completion_tokens=conv.config.cerebras_max_tokens,
@@ -496,38 +838,72 @@ def handle_message(data):
         )
         
         full_response = []
+        pending: List[str] = []  # Filtered text not yet emitted to the client
+        pending_len = 0
+        usage = None
         for chunk in stream:
+            # The final chunk carries token usage (and usually no choices)
+            usage = getattr(chunk, "usage", None) or usage
             try:
                 delta = chunk.choices[0].delta
                 piece = getattr(delta, "content", None)
                 if piece:
                     # Filter out <think> tags
-                    filtered = conv.llm._filter_think_text(piece)
+                    filtered = conv.llm.filter_stream_piece(piece)
                     if filtered:
-                        emit('ai_chunk', {'content': filtered})
                         full_response.append(filtered)
+                        audio.feed(filtered)
+                        pending.append(filtered)
+                        pending_len += len(filtered)
+                        # One Socket.IO frame per ~AI_CHUNK_EMIT_CHARS instead of per token
+                        if pending_len >= AI_CHUNK_EMIT_CHARS:
+                            emit('ai_chunk', {'content': ''.join(pending), 'messageId': message_id})
+                            pending.clear()
+                            pending_len = 0
             except (AttributeError, IndexError):    
                 continue
+        # Release a partial tag held back at the end of the stream
+        tail = conv.llm.flush_think_filter()
+        if tail:
+            full_response.append(tail)
+            audio.feed(tail)
+            pending.append(tail)
+        if pending:
+            emit('ai_chunk', {'content': ''.join(pending), 'messageId': message_id})
+        audio.close()
+        
+        if usage is not None:
+            print(f'[WebSocket] Prompt tokens for {session_id}: {getattr(usage, "prompt_tokens", None)} '
+                  f'(cached: {_cached_prompt_tokens(usage)})')
         
         # Update conversation history
         response_text = ''.join(full_response)
-        conv.history.append(human_msg)
-        conv.history.append(AIMessage(content=response_text))
+        conv.append_turn(human_msg, AIMessage(content=response_text))
         conv.speak_async(response_text)
-        audio_payload = conv.build_audio_payload(response_text) or {}
 
-        # Notify client that response is complete
-        emit('ai_complete', {
-            'fullResponse': response_text,
-            'history': conv.get_history(),
-            **audio_payload
-        })
+        # Notify client that response is complete. The text already went out as
+        # ai_chunk events and audio as audio_chunk, so only send an id; clients that
+        # need the full history can ask for it with get_history.
+        emit('ai_complete', {'messageId': message_id})
         
         print(f'[WebSocket] Completed response for {session_id}: {len(response_text)} chars')
         
     except Exception as e:
         print(f'[WebSocket] Error handling message: {e}', file=sys.stderr)
         emit('error', {'message': f'Error generating response: {str(e)}'})
+    finally:
+        conv.turn_lock.release()
+        audio.close()
+
+
+@socketio.on('get_history')
+def handle_get_history(data):
+    """Send the conversation history on demand."""
+    session_id = data.get('sessionId')
+    if not session_id or session_id not in conversations:
+        emit('error', {'message': 'No active session. Please join a session first.'})
+        return
+    emit('history', {'sessionId': session_id, 'history': conversations[session_id].get_history()})
 
 
 @socketio.on('stop_speaking')
@@ -3,6 +3,7 @@ Voice-driven interface for chatting with Cerebras-hosted LLMs.
 
 Requires the following third-party packages:
     pip install speechrecognition pyaudio openai cerebras-cloud-sdk langchain-core langchain
+    pip install faster-whisper      (optional, local transcription instead of Google STT)
 
 Environment variables:
     CEREBRAS_API_KEY        -> Required. Key from cerebras.ai
@@ -13,6 +14,19 @@ Environment variables:
     CEREBRAS_TOP_P          -> Optional. Top-p sampling cutoff (default 0.95)
     SYSTEM_PROMPT           -> Optional system instruction for the assistant
     EXIT_PHRASES            -> Optional comma-separated exit triggers (default quit/exit/stop)
+    STT_BACKEND             -> auto | openvino | whisper | google (default auto: OpenVINO Wav2Vec2 on an
+                               Intel NPU, else faster-whisper, else Google;
+                               openvino needs: pip install openvino optimum[openvino] transformers)
+    WHISPER_MODEL           -> faster-whisper model size or path (default "base")
+    HISTORY_LOG_PATH        -> Append each exchange to this JSON-lines file (default unset: no logging)
+    HISTORY_MAX_TURNS       -> Exchanges kept in the prompt besides the system message (default 8)
+    FULL_DUPLEX             -> Keep listening while a reply plays; use with headphones (default false)
+    SEMANTIC_CACHE          -> Replay answers to near-duplicate questions (default false;
+                               needs: pip install sentence-transformers faiss-cpu)
+    SEMANTIC_CACHE_PATH     -> Where the semantic cache is persisted (default ~/.parley_semantic_cache.pkl)
+    TTS_CACHE               -> Reuse synthesized audio for repeated phrases (default false;
+                               needs: pip install diskcache)
+    TTS_CACHE_PATH          -> Directory for cached TTS audio (default ~/.parley_tts_cache)
 
 Usage:
     export CEREBRAS_API_KEY="..."
@@ -24,19 +38,31 @@ to stop the conversation.
 from __future__ import annotations
 
 import asyncio
-import base64
+import atexit
+import copy
+import functools
+import hashlib
+import importlib.util
+import inspect
+import io
+import json
 import os
+import pickle
+import queue
+import re
 import signal
 import sys
+import threading
 import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, List, Optional, Sequence, Tuple, Coroutine
+from typing import Any, AsyncIterator, Awaitable, Callable, FrozenSet, List, Optional, Sequence, Tuple, Coroutine
 
 from dotenv import load_dotenv
 from pydantic import ConfigDict
 
 try:
-    from langchain_core.callbacks.manager import CallbackManagerForLLMRun
+    from langchain_core.callbacks.manager import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
     from langchain_core.language_models.chat_models import BaseChatModel
     from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
     from langchain_core.outputs import ChatGeneration, ChatResult
@@ -44,7 +70,7 @@ except ImportError as exc:  # pragma: no cover
     BaseChatModel = None  # type: ignore
     AIMessage = BaseMessage = HumanMessage = SystemMessage = None  # type: ignore
     ChatGeneration = ChatResult = None  # type: ignore
-    CallbackManagerForLLMRun = None  # type: ignore
+    CallbackManagerForLLMRun = AsyncCallbackManagerForLLMRun = None  # type: ignore
     _LANGCHAIN_IMPORT_ERROR = exc
 else:
     _LANGCHAIN_IMPORT_ERROR = None
@@ -56,6 +82,39 @@ except ImportError as exc:  # pragma: no cover
 else:
     _SR_IMPORT_ERROR = None
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+try:
+    import pybase64 as base64  # SIMD encoder, drop-in for the stdlib module
+except ImportError:  # pragma: no cover
+    import base64
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover
+    uvloop = None  # type: ignore
+
+try:
+    import diskcache
+except ImportError:  # pragma: no cover
+    diskcache = None  # type: ignore
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError as exc:  # pragma: no cover
+    WhisperModel = None  # type: ignore
+    _WHISPER_IMPORT_ERROR = exc
+else:
+    _WHISPER_IMPORT_ERROR = None
+
 try:
     from openai import AsyncOpenAI
     from openai.helpers import LocalAudioPlayer
@@ -67,9 +126,9 @@ else:
     _OPENAI_IMPORT_ERROR = None
 
 try:
-    from cerebras.cloud.sdk import Cerebras
+    from cerebras.cloud.sdk import AsyncCerebras, Cerebras
 except ImportError as exc:  # pragma: no cover
-    Cerebras = None  # type: ignore
+    AsyncCerebras = Cerebras = None  # type: ignore
     _CEREBRAS_IMPORT_ERROR = exc
 else:
     _CEREBRAS_IMPORT_ERROR = None
@@ -79,14 +138,87 @@ DEFAULT_CEREBRAS_MODEL = "qwen-3-32b"
 DEFAULT_MAX_TOKENS = 40960
 DEFAULT_TEMPERATURE = 0.6
 DEFAULT_TOP_P = 0.95
+HISTORY_LOG_QUEUE_SIZE = 128  # Exchanges buffered for the log writer before new ones are dropped
+HTTP_KEEPALIVE_CONNECTIONS = 8
+HTTP_KEEPALIVE_S = 300  # Idle connections stay warm across conversation turns
+VAD_SAMPLE_RATE = 16000
+VAD_FRAME_SAMPLES = 512  # 32 ms; the frame size Silero expects at 16 kHz
+VAD_SPEECH_PROB = 0.5
+VAD_END_SILENCE_MS = 500
+OPENVINO_STT_MODEL = "facebook/wav2vec2-base-960h"
+OPENVINO_STT_MAX_SECONDS = 15  # NPUs need a static input shape; utterances are padded/truncated to this
+AMBIENT_RECALIBRATE_S = 300  # Noise floor is re-measured after this long...
+AMBIENT_MISS_LIMIT = 3  # ...or after this many unintelligible captures in a row
+MIC_RING_FRAMES = 30 * VAD_SAMPLE_RATE // VAD_FRAME_SAMPLES  # ~30 s of capture history
+VAD_PREROLL_FRAMES = 10  # Audio kept from just before speech starts, so onsets aren't clipped
+SEMANTIC_CACHE_THRESHOLD = 0.92  # Cosine similarity needed to reuse an answer
+SEMANTIC_CACHE_CONTEXT_MESSAGES = 2  # Prior turns that must match for a hit
+TTS_MAX_CONCURRENT = 3  # Sentence syntheses in flight ahead of playback
+TTS_CACHE_SIZE_LIMIT = 512 << 20  # Bytes of audio kept before LRU eviction
+_SENTENCE_END_RE = re.compile(r"[.!?]+(?=\s)|\n")
+_THINK_TAGS = ("<think>", "</think>")
+_THINK_TAG_MAX = max(len(tag) for tag in _THINK_TAGS)
+_THINK_RE = re.compile("|".join(re.escape(tag) for tag in _THINK_TAGS))
 
 
-def _comma_env(name: str, fallback: Sequence[str]) -> Tuple[str, ...]:
+def _comma_env(name: str, fallback: Sequence[str]) -> FrozenSet[str]:
     raw = os.getenv(name)
     if not raw:
-        return tuple(fallback)
-    cleaned = tuple(filter(None, (part.strip().lower() for part in raw.split(","))))
-    return cleaned or tuple(fallback)
+        return frozenset(fallback)
+    cleaned = frozenset(filter(None, (part.strip().casefold() for part in raw.split(","))))
+    return cleaned or frozenset(fallback)
+
+
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide event loop, starting its daemon thread on first use.
+
+    Every async client call runs here so AsyncOpenAI/AsyncCerebras keep their
+    pooled connections across turns instead of losing them with each loop.
+    """
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            # libuv's loop has much cheaper callbacks for many small streamed chunks
+            _background_loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+            threading.Thread(target=_background_loop.run_forever, name="speech-loop", daemon=True).start()
+        return _background_loop
+
+
+def _run_coroutine(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run ``coro`` on the background loop and block until it returns."""
+    loop = _get_background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:  # pragma: no cover
+        coro.close()
+        raise RuntimeError("Cannot block on the speech event loop from inside it.")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def _http_client_kwargs() -> dict:
+    return {
+        # HTTP/2 needs the h2 package (pip install httpx[http2]); HTTP/1.1 keep-alive otherwise
+        "http2": importlib.util.find_spec("h2") is not None,
+        "limits": httpx.Limits(max_keepalive_connections=HTTP_KEEPALIVE_CONNECTIONS, keepalive_expiry=HTTP_KEEPALIVE_S),
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _get_http_client() -> Optional["httpx.Client"]:
+    """Shared pooled transport for the sync SDK clients; None lets the SDKs use their own."""
+    return httpx.Client(**_http_client_kwargs()) if httpx is not None else None
+
+
+@functools.lru_cache(maxsize=None)
+def _get_async_http_client() -> Optional["httpx.AsyncClient"]:
+    """Async counterpart of _get_http_client; only used on the background loop."""
+    return httpx.AsyncClient(**_http_client_kwargs()) if httpx is not None else None
 load_dotenv('.env.local')
 
 
@@ -120,12 +252,23 @@ class Config:
         )
     )
     openai_tts_response_format: str = field(default_factory=lambda: os.getenv("OPENAI_TTS_RESPONSE_FORMAT", "pcm"))
-    exit_phrases: Tuple[str, ...] = field(default_factory=lambda: _comma_env("EXIT_PHRASES", DEFAULT_EXIT_PHRASES))
+    exit_phrases: FrozenSet[str] = field(default_factory=lambda: _comma_env("EXIT_PHRASES", DEFAULT_EXIT_PHRASES))
     energy_threshold: int = field(default_factory=lambda: int(os.getenv("ENERGY_THRESHOLD", "300")))
     pause_threshold: float = field(default_factory=lambda: float(os.getenv("PAUSE_THRESHOLD", "0.8")))
     phrase_time_limit: Optional[int] = field(
         default_factory=lambda: int(os.getenv("PHRASE_TIME_LIMIT", "12")) if os.getenv("PHRASE_TIME_LIMIT") else None
     )
+    stt_backend: str = field(default_factory=lambda: os.getenv("STT_BACKEND", "auto").strip().lower())
+    whisper_model: str = field(default_factory=lambda: os.getenv("WHISPER_MODEL", "base"))
+    history_log_path: str = field(default_factory=lambda: os.getenv("HISTORY_LOG_PATH", ""))
+    history_max_turns: int = field(default_factory=lambda: int(os.getenv("HISTORY_MAX_TURNS", "8")))
+    full_duplex: bool = field(default_factory=lambda: os.getenv("FULL_DUPLEX", "false").lower() == "true")
+    semantic_cache: bool = field(default_factory=lambda: os.getenv("SEMANTIC_CACHE", "false").lower() == "true")
+    semantic_cache_path: str = field(
+        default_factory=lambda: os.getenv("SEMANTIC_CACHE_PATH", "~/.parley_semantic_cache.pkl")
+    )
+    tts_cache: bool = field(default_factory=lambda: os.getenv("TTS_CACHE", "false").lower() == "true")
+    tts_cache_path: str = field(default_factory=lambda: os.getenv("TTS_CACHE_PATH", "~/.parley_tts_cache"))
 
     def validate(self) -> None:
         if not self.cerebras_api_key:
@@ -143,30 +286,262 @@ class Config:
             raise SystemExit(f"speechrecognition is not installed (pip install speechrecognition). Details: {_SR_IMPORT_ERROR}")
 
 
+@functools.lru_cache(maxsize=None)
+def _get_openvino_stt(backend: str) -> Optional[Tuple[Any, Any, bool]]:
+    """Compile Wav2Vec2 with OpenVINO once per process as (model, processor, static_shape).
+
+    On "auto" this only happens when an NPU is present; None means fall back.
+    """
+    if backend not in ("auto", "openvino") or np is None:
+        return None
+    try:
+        import openvino as ov
+        from optimum.intel import OVModelForCTC
+        from transformers import AutoProcessor
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        if backend == "openvino":
+            print(f"OpenVINO STT unavailable. Details: {exc}", file=sys.stderr)
+        return None
+    devices = ov.Core().available_devices
+    if "NPU" in devices:
+        device = "NPU"
+    elif backend == "openvino":
+        device = "CPU"
+    else:
+        return None
+    try:
+        model = OVModelForCTC.from_pretrained(OPENVINO_STT_MODEL, export=True, device=device, compile=False)
+        if device == "NPU":
+            model.reshape(1, OPENVINO_STT_MAX_SECONDS * VAD_SAMPLE_RATE)
+        model.compile()
+        processor = AutoProcessor.from_pretrained(OPENVINO_STT_MODEL)
+    except Exception as exc:  # pragma: no cover - driver / download failures
+        print(f"OpenVINO STT unavailable on {device}. Details: {exc}", file=sys.stderr)
+        return None
+    return model, processor, device == "NPU"
+
+
+@functools.lru_cache(maxsize=None)
+def _get_whisper_model(model_size: str) -> "WhisperModel":
+    """Process-wide faster-whisper model; loading it is the expensive part."""
+    return WhisperModel(model_size, device="cpu", compute_type="int8")
+
+
+@functools.lru_cache(maxsize=None)
+def _get_silero_vad() -> Optional[Tuple[Any, Any]]:
+    """Load Silero VAD once per process as (torch, model); None if unavailable."""
+    if np is None:
+        return None
+    try:
+        import torch
+
+        model, _ = torch.hub.load("snakers4/silero-vad", "silero_vad", trust_repo=True)
+    except Exception as exc:  # pragma: no cover - optional dependency / offline
+        print(f"Silero VAD unavailable, using energy threshold. Details: {exc}", file=sys.stderr)
+        return None
+    return torch, model
+
+
 class SpeechRecognizer:
-    """Thin wrapper around speech_recognition for blocking microphone capture."""
+    """Thin wrapper around speech_recognition for blocking microphone capture.
+
+    Transcription runs locally: on an Intel NPU through an OpenVINO-compiled
+    Wav2Vec2 CTC model, otherwise with faster-whisper (int8, greedy decoding),
+    falling back to Google's web API when neither is available. With Silero
+    VAD available, capture is gated frame by frame on speech probability instead
+    of a per-turn ambient-noise calibration and energy threshold.
+    """
 
     def __init__(self, config: Config) -> None:
         self.recognizer = sr.Recognizer()
         self.recognizer.energy_threshold = config.energy_threshold
         self.recognizer.pause_threshold = config.pause_threshold
         self.phrase_time_limit = config.phrase_time_limit
+        self.model = None
+        self.ov_model = self.processor = None
+        self._ov_static_shape = False
+        openvino_stt = _get_openvino_stt(config.stt_backend)
+        if openvino_stt is not None:
+            self.ov_model, self.processor, self._ov_static_shape = openvino_stt
+        if self.ov_model is None and config.stt_backend != "google":
+            if WhisperModel is not None:
+                self.model = _get_whisper_model(config.whisper_model)
+            else:
+                print(f"faster-whisper unavailable, using Google STT. Details: {_WHISPER_IMPORT_ERROR}", file=sys.stderr)
+        self._torch = None
+        self.vad = self._load_vad()
+        self._ambient_ts: Optional[float] = None  # First listen() calibrates
+        self._misses = 0
+        self._stream = None  # Opened on the first listen(), so idle recognizers hold no device
+
+    def _load_vad(self):
+        loaded = _get_silero_vad()
+        if loaded is None:
+            return None
+        self._torch, model = loaded
+        # The model carries streaming state between frames, so each recognizer gets its own copy
+        return copy.deepcopy(model)
 
     def listen(self) -> Optional[str]:
-        with sr.Microphone() as source:
-            print("Listening...")
-            self.recognizer.adjust_for_ambient_noise(source, duration=1) 
-            audio = self.recognizer.listen(source, phrase_time_limit=self.phrase_time_limit)
+        if self.vad is not None:
+            audio = self._capture_vad()
+        else:
+            with sr.Microphone() as source:
+                if (
+                    self._ambient_ts is None
+                    or time.monotonic() - self._ambient_ts > AMBIENT_RECALIBRATE_S
+                    or self._misses >= AMBIENT_MISS_LIMIT
+                ):
+                    self._calibrate(source)
+                print("Listening...")
+                audio = self.recognizer.listen(source, phrase_time_limit=self.phrase_time_limit)
         try:
-            text = self.recognizer.recognize_google(audio)
+            text = self._transcribe(audio)
+            self._misses = 0
             return text.strip()
         except sr.UnknownValueError:
+            self._misses += 1
             print("Transcription: (could not understand audio)")
             return None
         except sr.RequestError as exc:
             print(f"Speech recognition request failed: {exc}", file=sys.stderr)
             return None
 
+    def _calibrate(self, source: "sr.Microphone") -> None:
+        """Measure the noise floor for the energy threshold; only the non-VAD path needs it."""
+        self.recognizer.adjust_for_ambient_noise(source, duration=1)
+        self._ambient_ts = time.monotonic()
+        self._misses = 0
+
+    def _open_mic(self) -> None:
+        """Start the persistent capture stream that feeds the ring buffer."""
+        import pyaudio
+
+        self._ring = np.zeros(MIC_RING_FRAMES * VAD_FRAME_SAMPLES, np.int16)
+        self._write_pos = 0  # Total samples written; only the callback advances it
+        self._data_ready = threading.Event()
+        self._pa_continue = pyaudio.paContinue
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=VAD_SAMPLE_RATE,
+            input=True,
+            frames_per_buffer=VAD_FRAME_SAMPLES,
+            stream_callback=self._on_audio,
+        )
+
+    def _on_audio(self, in_data, frame_count, time_info, status):
+        """PortAudio callback: copy into the preallocated ring, no per-frame allocation."""
+        samples = np.frombuffer(in_data, np.int16)
+        count = len(samples)
+        size = len(self._ring)
+        if count > size:
+            samples = samples[-size:]  # Only the newest ring's worth can be kept
+        start = (self._write_pos + count - len(samples)) % size
+        end = start + len(samples)
+        if end <= size:
+            self._ring[start:end] = samples
+        else:
+            split = size - start
+            self._ring[start:] = samples[:split]
+            self._ring[:end - size] = samples[split:]
+        self._write_pos += count  # Publish only once the copy is complete
+        self._data_ready.set()
+        return None, self._pa_continue
+
+    def _read_frame(self, pos: int) -> Tuple["np.ndarray", int]:
+        """Block until the VAD frame starting at sample ``pos`` is captured."""
+        while self._write_pos - pos < VAD_FRAME_SAMPLES:
+            self._data_ready.wait(0.1)
+            self._data_ready.clear()
+        if self._write_pos - pos > len(self._ring) // 2:
+            # Fell too far behind; skip ahead rather than read audio being overwritten
+            pos = self._write_pos - self._write_pos % VAD_FRAME_SAMPLES - VAD_FRAME_SAMPLES
+        start = pos % len(self._ring)
+        return self._ring[start:start + VAD_FRAME_SAMPLES].copy(), pos + VAD_FRAME_SAMPLES
+
+    def close(self) -> None:
+        stream = getattr(self, "_stream", None)
+        if stream is not None:
+            stream.stop_stream()
+            stream.close()
+            self._pa.terminate()
+            self._stream = None
+
+    def _capture_vad(self) -> "sr.AudioData":
+        """Record one utterance, ending after VAD_END_SILENCE_MS of non-speech."""
+        end_silence_frames = VAD_END_SILENCE_MS * VAD_SAMPLE_RATE // (1000 * VAD_FRAME_SAMPLES)
+        max_frames = (
+            self.phrase_time_limit * VAD_SAMPLE_RATE // VAD_FRAME_SAMPLES if self.phrase_time_limit else None
+        )
+        preroll: deque = deque(maxlen=VAD_PREROLL_FRAMES)
+        frames: List["np.ndarray"] = []
+        silent_frames = 0
+        self.vad.reset_states()
+        if self._stream is None:
+            self._open_mic()
+        # Start at the live edge so audio from before this turn (e.g. our own reply) is ignored
+        pos = self._write_pos - self._write_pos % VAD_FRAME_SAMPLES
+        print("Listening...")
+        while True:
+            frame, pos = self._read_frame(pos)
+            pcm = frame.astype(np.float32) / 32768.0
+            speech = self.vad(self._torch.from_numpy(pcm), VAD_SAMPLE_RATE).item() > VAD_SPEECH_PROB
+            if not frames:
+                # Nothing is buffered for ASR until speech is confirmed
+                preroll.append(frame)
+                if speech:
+                    frames.extend(preroll)
+                continue
+            frames.append(frame)
+            silent_frames = 0 if speech else silent_frames + 1
+            if silent_frames >= end_silence_frames:
+                break
+            if max_frames is not None and len(frames) >= max_frames:
+                break
+        return sr.AudioData(np.concatenate(frames).tobytes(), VAD_SAMPLE_RATE, 2)
+
+    def _transcribe(self, audio: "sr.AudioData") -> str:
+        if self.model is None and self.ov_model is None:
+            return self.recognizer.recognize_google(audio)
+        raw = audio.get_raw_data(convert_rate=16000, convert_width=2)
+        pcm = np.frombuffer(raw, np.int16).astype(np.float32) / 32768.0
+        if self.ov_model is not None:
+            text = self._transcribe_openvino(pcm)
+        else:
+            segments, _ = self.model.transcribe(pcm, beam_size=1, vad_filter=True, language="en")
+            text = "".join(segment.text for segment in segments)
+        if not text.strip():
+            raise sr.UnknownValueError()
+        return text
+
+    def _transcribe_openvino(self, pcm: "np.ndarray") -> str:
+        inputs = self.processor(pcm, sampling_rate=VAD_SAMPLE_RATE, return_tensors="np")
+        input_values = inputs.input_values
+        if self._ov_static_shape:
+            max_samples = OPENVINO_STT_MAX_SECONDS * VAD_SAMPLE_RATE
+            input_values = input_values[:, :max_samples]
+            input_values = np.pad(input_values, ((0, 0), (0, max_samples - input_values.shape[1])))
+        logits = self.ov_model(input_values=input_values).logits
+        # Greedy CTC: best token per frame; the processor collapses repeats and blanks
+        ids = np.argmax(logits, axis=-1)
+        return self.processor.batch_decode(ids)[0].lower()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_tts_cache(path: str) -> "diskcache.Cache":
+    """One on-disk audio cache per path for the whole process, closed at exit."""
+    if diskcache is None:
+        raise RuntimeError("diskcache is not installed (pip install diskcache)")
+    cache = diskcache.Cache(
+        os.path.expanduser(path),
+        size_limit=TTS_CACHE_SIZE_LIMIT,
+        eviction_policy="least-recently-used",
+    )
+    atexit.register(cache.close)
+    return cache
+
 
 class TextToSpeechEngine:
     """OpenAI streaming text-to-speech helper."""
@@ -179,9 +554,16 @@ class TextToSpeechEngine:
         if not config.openai_api_key:
             raise RuntimeError("Missing OPENAI_API_KEY environment variable.")
         self.config = config
-        self.client = AsyncOpenAI(api_key=config.openai_api_key)
+        self.client = AsyncOpenAI(api_key=config.openai_api_key, http_client=_get_async_http_client())
         self.player = LocalAudioPlayer()
         self._response_format = (self.config.openai_tts_response_format or "mp3").strip()
+        self._mime_type_cached = self._compute_mime_type()
+        self._tts_cache = None
+        if config.tts_cache:
+            try:
+                self._tts_cache = _get_tts_cache(config.tts_cache_path)
+            except Exception as exc:  # pragma: no cover - optional dependency
+                print(f"TTS cache disabled: {exc}", file=sys.stderr)
 
     def _build_request_args(self, text: str) -> dict:
         instructions = (self.config.openai_tts_instructions or "").strip()
@@ -195,53 +577,112 @@ class TextToSpeechEngine:
             request_args["instructions"] = instructions
         return request_args
 
+    def _cache_key(self, request_args: dict) -> str:
+        parts = (
+            request_args["model"],
+            request_args["voice"],
+            request_args.get("instructions", ""),
+            request_args["response_format"],
+            request_args["input"],
+        )
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
     async def _stream_response(self, text: str) -> None:
         request_args = self._build_request_args(text)
+        if self._tts_cache is not None and np is not None and self._response_format.lower() == "pcm":
+            cached = self._tts_cache.get(self._cache_key(request_args))
+            if cached is not None:
+                await self.player.play(np.frombuffer(cached, dtype=np.int16))
+                return
         async with self.client.audio.speech.with_streaming_response.create(**request_args) as response:
             await self.player.play(response)
 
-    async def _collect_audio_bytes(self, text: str) -> bytes:
+    async def stream_audio_chunks(self, text: str) -> AsyncIterator[bytes]:
+        """Yield synthesized audio for ``text`` as it arrives from OpenAI."""
         request_args = self._build_request_args(text)
         async with self.client.audio.speech.with_streaming_response.create(**request_args) as response:
-            audio_bytes = bytearray()
             async for chunk in response.iter_bytes():
-                audio_bytes.extend(chunk)
-        return bytes(audio_bytes)
+                yield chunk
 
-    @staticmethod
-    def _run_async(coro: Coroutine[Any, Any, None]) -> None:
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            asyncio.run(coro)
+    async def _collect_audio_bytes(self, text: str) -> bytes:
+        cache_key = None
+        if self._tts_cache is not None:
+            cache_key = self._cache_key(self._build_request_args(text))
+            cached = self._tts_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        audio_bytes = b"".join([chunk async for chunk in self.stream_audio_chunks(text)])
+        if cache_key is not None and audio_bytes:
+            self._tts_cache.set(cache_key, audio_bytes)
+        return audio_bytes
+
+    def speak(self, text: str) -> None:
+        if not text.strip():
             return
-        loop.create_task(coro)
+        _run_coroutine(self._stream_response(text.strip()))
 
-    @staticmethod
-    def _run_async_with_result(coro: Coroutine[Any, Any, bytes]) -> bytes:
+    async def speak_sentences(self, sentences: "asyncio.Queue[Optional[str]]") -> None:
+        """Play queued sentences in order until a ``None``, synthesizing ahead of playback.
+
+        Up to TTS_MAX_CONCURRENT sentences are requested from OpenAI at once, so
+        the next clip is usually ready by the time the current one finishes.
+        """
+        if np is None or self._response_format.lower() != "pcm":
+            # Only raw PCM can be handed to the player as samples; stream one at a time
+            while (sentence := await sentences.get()) is not None:
+                await self.aspeak(sentence)
+            return
+        limit = asyncio.Semaphore(TTS_MAX_CONCURRENT)
+        clips: "asyncio.Queue[Optional[asyncio.Task]]" = asyncio.Queue()
+
+        async def _synthesize(text: str) -> bytes:
+            async with limit:
+                return await self._collect_audio_bytes(text)
+
+        async def _schedule() -> None:
+            try:
+                while (sentence := await sentences.get()) is not None:
+                    if sentence.strip():
+                        await clips.put(asyncio.create_task(_synthesize(sentence.strip())))
+            finally:
+                await clips.put(None)
+
+        scheduler = asyncio.create_task(_schedule())
+        clip: Optional[asyncio.Task] = None
         try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            return asyncio.run(coro)
-        if loop.is_running():  # pragma: no cover
-            raise RuntimeError("Cannot generate TTS audio while event loop is running.")
-        return loop.run_until_complete(coro)
+            while (clip := await clips.get()) is not None:
+                audio = await clip
+                if audio:
+                    await self.player.play(np.frombuffer(audio, dtype=np.int16))
+        finally:
+            scheduler.cancel()
+            # On cancellation or error, stop every request still in flight or queued
+            pending = [clip] if clip is not None else []
+            while not clips.empty():
+                pending.append(clips.get_nowait())
+            for task in pending:
+                if task is not None:
+                    task.cancel()
 
-    def speak(self, text: str) -> None:
+    async def aspeak(self, text: str) -> None:
+        """Stream ``text`` to the speaker, returning once playback has finished."""
         if not text.strip():
             return
-        self._run_async(self._stream_response(text.strip()))
+        await self._stream_response(text.strip())
 
     def synthesize_to_base64(self, text: str) -> Optional[Tuple[str, str]]:
         if not text.strip():
             return None
-        audio_bytes = self._run_async_with_result(self._collect_audio_bytes(text.strip()))
+        audio_bytes = _run_coroutine(self._collect_audio_bytes(text.strip()))
         if not audio_bytes:
             return None
         encoded = base64.b64encode(audio_bytes).decode("ascii")
         return encoded, self._mime_type()
 
     def _mime_type(self) -> str:
+        return self._mime_type_cached
+
+    def _compute_mime_type(self) -> str:
         fmt = self._response_format.lower().lstrip(".")
         mapping = {
             "mp3": "audio/mpeg",
@@ -258,61 +699,197 @@ class TextToSpeechEngine:
         return mapping.get(fmt, f"audio/{fmt}")
 
 
+class SemanticCache:
+    """Reuse answers for near-duplicate questions asked in the same context.
+
+    The latest user message is embedded with MiniLM and searched in a FAISS
+    inner-product index (cosine, since embeddings are normalized). A hit also
+    requires the system prompt and the preceding turns to hash the same, so an
+    answer is never replayed into a different conversation.
+    """
+
+    def __init__(self, path: str) -> None:
+        import faiss
+        from sentence_transformers import SentenceTransformer
+
+        self.path = os.path.expanduser(path)
+        self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        self.index = faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension())
+        self.entries: List[Tuple[str, str]] = []  # (context_hash, response) per index row
+        self._lock = threading.Lock()
+        self._load()
+
+    def key(self, messages: Sequence[BaseMessage]) -> Tuple[Any, str]:
+        """Return (query embedding, context hash) for the last message in ``messages``."""
+        embedding = self.model.encode(
+            [str(messages[-1].content).strip().lower()], normalize_embeddings=True
+        ).astype(np.float32)
+        prior = messages[:-1]
+        context = [msg for msg in prior if isinstance(msg, SystemMessage)]
+        context += [msg for msg in prior if not isinstance(msg, SystemMessage)][-SEMANTIC_CACHE_CONTEXT_MESSAGES:]
+        context_hash = hashlib.sha256("\n".join(str(msg.content) for msg in context).encode("utf-8")).hexdigest()
+        return embedding, context_hash
+
+    def get(self, key: Tuple[Any, str]) -> Optional[str]:
+        embedding, context_hash = key
+        with self._lock:
+            if not self.entries:
+                return None
+            scores, ids = self.index.search(embedding, min(5, len(self.entries)))
+            for score, idx in zip(scores[0], ids[0]):
+                if score < SEMANTIC_CACHE_THRESHOLD:
+                    break
+                if self.entries[idx][0] == context_hash:
+                    return self.entries[idx][1]
+        return None
+
+    def put(self, key: Tuple[Any, str], response: str) -> None:
+        embedding, context_hash = key
+        with self._lock:
+            self.index.add(embedding)
+            self.entries.append((context_hash, response))
+
+    def save(self) -> None:
+        with self._lock:
+            if not self.entries:
+                return
+            embeddings = self.index.reconstruct_n(0, self.index.ntotal)
+            entries = list(self.entries)
+        with open(self.path, "wb") as fh:
+            pickle.dump({"embeddings": embeddings, "entries": entries}, fh)
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as fh:
+                data = pickle.load(fh)
+            self.index.add(data["embeddings"])
+            self.entries = list(data["entries"])
+        except Exception as exc:
+            print(f"Could not load semantic cache: {exc}", file=sys.stderr)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_semantic_cache(path: str) -> SemanticCache:
+    """One cache (and embedding model) per path for the whole process, saved at exit."""
+    cache = SemanticCache(path)
+    atexit.register(cache.save)
+    return cache
+
+
+_MESSAGE_ROLES = {SystemMessage: "system", AIMessage: "assistant", HumanMessage: "user"}
+
+
+@functools.lru_cache(maxsize=None)
+def _get_cerebras_client(api_key: str, base_url: str) -> Cerebras:
+    """Process-wide client per credentials, so every chat model reuses one connection pool."""
+    init_kwargs = {"api_key": api_key, "http_client": _get_http_client()}
+    if base_url:
+        init_kwargs["base_url"] = base_url
+    return Cerebras(**init_kwargs)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_async_cerebras_client(api_key: str, base_url: str) -> AsyncCerebras:
+    """Async counterpart of _get_cerebras_client, used by _agenerate."""
+    init_kwargs = {"api_key": api_key, "http_client": _get_async_http_client()}
+    if base_url:
+        init_kwargs["base_url"] = base_url
+    return AsyncCerebras(**init_kwargs)
+
+
 class LangChainCerebrasChat(BaseChatModel):
     """LangChain-compatible chat model backed by the Cerebras SDK."""
 
     client: Optional[Cerebras] = None
+    async_client: Optional[AsyncCerebras] = None
     config: Optional[Config] = None
     last_stream_printed: bool = False
     _inside_think: bool = False
+    _think_pending: str = ""
+    _prefix_digest: Optional[str] = None
+    _semantic_cache: Optional[SemanticCache] = None
 
     model_config = ConfigDict(arbitrary_types_allowed=True, extra="allow")
 
     def __init__(self, config: Config) -> None:
         super().__init__(config=config)
-        init_kwargs = {"api_key": config.cerebras_api_key}
-        if config.cerebras_base_url:
-            init_kwargs["base_url"] = config.cerebras_base_url
-        self.client = Cerebras(**init_kwargs)
+        self.client = _get_cerebras_client(config.cerebras_api_key, config.cerebras_base_url)
+        self.async_client = _get_async_cerebras_client(config.cerebras_api_key, config.cerebras_base_url)
         self.config = config
         self.last_stream_printed = False
-        self._inside_think = False
+        self.reset_think_filter()
+        self._semantic_cache = None
+        if config.semantic_cache:
+            try:
+                self._semantic_cache = _get_semantic_cache(config.semantic_cache_path)
+            except Exception as exc:  # pragma: no cover - optional dependency
+                print(f"Semantic cache disabled: {exc}", file=sys.stderr)
 
     @property
     def _llm_type(self) -> str:  # pragma: no cover - metadata only
         return "cerebras-langchain-chat"
 
+    def reset_think_filter(self) -> None:
+        """Start a new stream: forget any open think block or held-back partial tag."""
+        self._inside_think = False
+        self._think_pending = ""
+
+    def filter_stream_piece(self, piece: str) -> str:
+        """Return the user-visible part of one streamed piece of reply text."""
+        return self._filter_think_text(piece)
+
+    def flush_think_filter(self) -> str:
+        """Finish the stream, returning visible text that was held back as a possible tag."""
+        return self._flush_think_text()
+
     def _filter_think_text(self, text: str) -> str:
         """Strip <think>...</think> regions that should remain hidden."""
-        if not text:
+        buf = self._think_pending + text
+        if not buf:
             return ""
-        output_chars: List[str] = []
-        i = 0
-        while i < len(text):
-            if not self._inside_think and text.startswith("<think>", i):
-                self._inside_think = True
-                i += len("<think>")
-                continue
-            if self._inside_think and text.startswith("</think>", i):
-                self._inside_think = False
-                i += len("</think>")
-                continue
+        if "<" not in buf:
+            # Most chunks carry no tag at all; skip the regex and slicing
+            self._think_pending = ""
+            return "" if self._inside_think else buf
+        # A tag may be split across chunks; hold back a trailing partial one
+        self._think_pending = ""
+        cut = buf.rfind("<", max(0, len(buf) - _THINK_TAG_MAX + 1))
+        if cut != -1 and any(tag.startswith(buf[cut:]) and tag != buf[cut:] for tag in _THINK_TAGS):
+            buf, self._think_pending = buf[:cut], buf[cut:]
+        parts: List[str] = []
+        start = 0
+        for match in _THINK_RE.finditer(buf):
             if not self._inside_think:
-                output_chars.append(text[i])
-            i += 1
-        return "".join(output_chars)
+                parts.append(buf[start:match.start()])
+                if match.group() == "<think>":
+                    self._inside_think = True
+                else:
+                    parts.append(match.group())  # Stray closing tag stays visible
+            elif match.group() == "</think>":
+                self._inside_think = False
+            start = match.end()
+        if not self._inside_think:
+            parts.append(buf[start:])
+        return "".join(parts)
+
+    def _flush_think_text(self) -> str:
+        """Release a held-back partial tag once the stream has ended."""
+        pending, self._think_pending = self._think_pending, ""
+        return "" if self._inside_think else pending
 
     def _convert_messages(self, messages: List[BaseMessage]) -> List[dict]:
         formatted: List[dict] = []
         for message in messages:
-            role = "user"
-            if isinstance(message, SystemMessage):
-                role = "system"
-            elif isinstance(message, AIMessage):
-                role = "assistant"
-            elif isinstance(message, HumanMessage):
-                role = "user"
+            role = _MESSAGE_ROLES.get(type(message))
+            if role is None:
+                # Subclasses such as AIMessageChunk miss the exact-type lookup
+                role = next((name for cls, name in _MESSAGE_ROLES.items() if isinstance(message, cls)), "user")
             content = message.content
+            if content.__class__ is str:
+                formatted.append({"role": role, "content": content})
+                continue
             if isinstance(content, list):
                 text_fragments: List[str] = []
                 for fragment in content:
@@ -324,6 +901,73 @@ class LangChainCerebrasChat(BaseChatModel):
             formatted.append({"role": role, "content": str(content)})
         return formatted
 
+    def _check_prefix(self, payload: List[dict]) -> None:
+        """Warn when the system message changes between requests.
+
+        Provider-side prompt caching only reuses prefill for a byte-identical
+        prefix, so any edit to the leading system message costs a full prefill.
+        """
+        if not payload or payload[0]["role"] != "system":
+            return
+        digest = hashlib.sha256(payload[0]["content"].encode("utf-8")).hexdigest()[:12]
+        if self._prefix_digest is not None and digest != self._prefix_digest:
+            print(
+                f"[Prompt cache] System prefix changed ({self._prefix_digest} -> {digest}); cached prefill is lost.",
+                file=sys.stderr,
+            )
+        self._prefix_digest = digest
+
+    def _request_kwargs(self, messages: List[BaseMessage]) -> dict:
+        payload = self._convert_messages(messages)
+        self._check_prefix(payload)
+        return {
+            "messages": payload,
+            "model": self.config.cerebras_model,
+            "stream": True,
+            "max_completion_tokens": self.config.cerebras_max_tokens,
+            "temperature": self.config.cerebras_temperature,
+            "top_p": self.config.cerebras_top_p,
+        }
+
+    def _cache_lookup(self, messages: List[BaseMessage]) -> Tuple[Optional[Tuple[Any, str]], Optional[str]]:
+        """Return (cache key, cached answer); both are None when caching does not apply."""
+        if self._semantic_cache is None or not messages or not isinstance(messages[-1], HumanMessage):
+            return None, None
+        cache_key = self._semantic_cache.key(messages)
+        cached = self._semantic_cache.get(cache_key)
+        if cached is not None:
+            print(cached, flush=True)
+            self.last_stream_printed = True
+        return cache_key, cached
+
+    def _visible_piece(self, chunk: Any) -> str:
+        try:
+            delta = chunk.choices[0].delta
+            piece = getattr(delta, "content", None)
+        except (AttributeError, IndexError):
+            piece = None
+        if not piece:
+            return ""
+        filtered = self._filter_think_text(piece)
+        if filtered:
+            print(filtered, end="", flush=True)
+            self.last_stream_printed = True
+        return filtered
+
+    def _build_result(self, buf: io.StringIO, cache_key: Optional[Tuple[Any, str]]) -> ChatResult:
+        tail = self._flush_think_text()
+        if tail:
+            print(tail, end="", flush=True)
+            self.last_stream_printed = True
+            buf.write(tail)
+        if self.last_stream_printed:
+            print()
+        text = buf.getvalue().strip()
+        if cache_key is not None and text:
+            self._semantic_cache.put(cache_key, text)
+        ai_message = AIMessage(content=text)
+        return ChatResult(generations=[ChatGeneration(message=ai_message)])
+
     def _generate(
         self,
         messages: List[BaseMessage],
@@ -331,35 +975,23 @@ class LangChainCerebrasChat(BaseChatModel):
         run_manager: Optional[CallbackManagerForLLMRun] = None,
         **kwargs: object,
     ) -> ChatResult:
-        payload = self._convert_messages(messages)
         _ = stop, kwargs  # stop sequences unsupported currently
         self.last_stream_printed = False
-        self._inside_think = False
+        self.reset_think_filter()
+        cache_key, cached = self._cache_lookup(messages)
+        if cached is not None:
+            if run_manager is not None:
+                run_manager.on_llm_new_token(cached)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=cached))])
         stream = None
-        chunks: List[str] = []
+        buf = io.StringIO()
         try:
-            stream = self.client.chat.completions.create(
-                messages=payload,
-                model=self.config.cerebras_model,
-                stream=True,
-                max_completion_tokens=self.config.cerebras_max_tokens,
-                temperature=self.config.cerebras_temperature,
-                top_p=self.config.cerebras_top_p,
-            )
+            stream = self.client.chat.completions.create(**self._request_kwargs(messages))
             for chunk in stream:
-                try:
-                    delta = chunk.choices[0].delta
-                    piece = getattr(delta, "content", None)
-                except (AttributeError, IndexError):
-                    piece = None
-                if not piece:
-                    continue
-                filtered = self._filter_think_text(piece)
+                filtered = self._visible_piece(chunk)
                 if not filtered:
                     continue
-                print(filtered, end="", flush=True)
-                chunks.append(filtered)
-                self.last_stream_printed = True
+                buf.write(filtered)
                 if run_manager is not None:
                     run_manager.on_llm_new_token(filtered)
         finally:
@@ -367,11 +999,78 @@ class LangChainCerebrasChat(BaseChatModel):
                 closer = getattr(stream, "close", None)
                 if callable(closer):
                     closer()
-        if self.last_stream_printed:
-            print()
-        text = "".join(chunks).strip()
-        ai_message = AIMessage(content=text)
-        return ChatResult(generations=[ChatGeneration(message=ai_message)])
+        return self._build_result(buf, cache_key)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        _ = stop, kwargs  # stop sequences unsupported currently
+        return await self._astream_result(messages, run_manager, None)
+
+    async def astream_sentences(
+        self, messages: List[BaseMessage], on_sentence: Callable[[str], Awaitable[None]]
+    ) -> AIMessage:
+        """Generate a reply, awaiting ``on_sentence`` with each sentence as soon as it ends.
+
+        Called directly rather than through ainvoke so the callback stays out of
+        LangChain's invocation params and callback metadata.
+        """
+        result = await self._astream_result(messages, None, on_sentence)
+        return result.generations[0].message
+
+    async def _astream_result(
+        self,
+        messages: List[BaseMessage],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun],
+        on_sentence: Optional[Callable[[str], Awaitable[None]]],
+    ) -> ChatResult:
+        self.last_stream_printed = False
+        self.reset_think_filter()
+        cache_key, cached = self._cache_lookup(messages)
+        if cached is not None:
+            if run_manager is not None:
+                await run_manager.on_llm_new_token(cached)
+            if on_sentence is not None:
+                await on_sentence(cached)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=cached))])
+        stream = None
+        buf = io.StringIO()
+        pending = ""  # Text since the last sentence boundary
+        try:
+            stream = await self.async_client.chat.completions.create(**self._request_kwargs(messages))
+            async for chunk in stream:
+                filtered = self._visible_piece(chunk)
+                if not filtered:
+                    continue
+                buf.write(filtered)
+                if run_manager is not None:
+                    await run_manager.on_llm_new_token(filtered)
+                if on_sentence is None:
+                    continue
+                pending += filtered
+                match = _SENTENCE_END_RE.search(pending)
+                while match:
+                    sentence, pending = pending[:match.end()].strip(), pending[match.end():]
+                    if sentence:
+                        await on_sentence(sentence)
+                    match = _SENTENCE_END_RE.search(pending)
+            if on_sentence is not None:
+                if not self._inside_think:
+                    pending += self._think_pending  # _build_result flushes it into buf
+                if pending.strip():
+                    await on_sentence(pending.strip())
+        finally:
+            if stream is not None:
+                closer = getattr(stream, "close", None)
+                if callable(closer):
+                    result = closer()
+                    if inspect.isawaitable(result):
+                        await result
+        return self._build_result(buf, cache_key)
 
 
 class ConversationLoop:
@@ -384,39 +1083,144 @@ class ConversationLoop:
         if config.system_instruction:
             self.history.append(SystemMessage(content=config.system_instruction))
         self._running = True
+        self._max_exit_len = max(map(len, config.exit_phrases), default=0)
+        self._turn_done: Optional[asyncio.Event] = None
+        self._prewarm_task: Optional[asyncio.Task] = None  # Held so the task isn't collected mid-flight
+        # A None entry tells the writer to exit; stop() sends it
+        self._persist_q: Optional["queue.Queue[Optional[Tuple[str, str]]]"] = None
+        self._persist_thread: Optional[threading.Thread] = None
+        if config.history_log_path:
+            self._persist_q = queue.Queue(maxsize=HISTORY_LOG_QUEUE_SIZE)
+            self._persist_thread = threading.Thread(target=self._persist_worker, name="history-log", daemon=True)
+            self._persist_thread.start()
+
+    def _persist_worker(self) -> None:
+        """Append exchanges to the history log so disk I/O never delays a turn."""
+        path = os.path.expanduser(self.config.history_log_path)
+        try:
+            with open(path, "a", encoding="utf-8") as log:
+                while (entry := self._persist_q.get()) is not None:
+                    user_text, assistant_text = entry
+                    log.write(json.dumps({"user": user_text, "assistant": assistant_text}) + "\n")
+                    log.flush()
+        except OSError as exc:
+            # Stop queueing exchanges nobody will write
+            self._persist_q = None
+            print(f"[History log] Disabled, cannot write {path}: {exc}", file=sys.stderr)
 
     def stop(self) -> None:
         self._running = False
+        persist_q, thread = self._persist_q, self._persist_thread
+        if persist_q is not None and thread is not None and thread.is_alive():
+            try:
+                persist_q.put(None, timeout=1.0)
+            except queue.Full:
+                return
+            thread.join(timeout=2.0)
 
+    async def run(self) -> None:
+        """Run listen -> respond -> speak as three tasks joined by queues.
 
-    # Dynamically delay 
-    def run(self) -> None:
+        Each reply is spoken sentence by sentence while the LLM is still
+        streaming the rest; with FULL_DUPLEX the microphone also reopens while a reply is playing.
+        """
         print("Voice chat ready. Say something (or 'quit' to exit).")
-        while self._running:
-            utterance = self.stt.listen()
-            if not utterance:
-                continue
-            normalized = utterance.lower()
-            print(f"You: {utterance}")
-            if normalized in self.config.exit_phrases:
-                print("Exit phrase detected. Goodbye!")
+        utterances: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+        replies: "asyncio.Queue[Optional[asyncio.Queue[Optional[str]]]]" = asyncio.Queue()
+        self._turn_done = asyncio.Event()
+        self._prewarm_task = asyncio.create_task(self._prewarm())
+        await asyncio.gather(
+            self._listen_task(utterances),
+            self._respond_task(utterances, replies),
+            self._speak_task(replies),
+        )
+
+    async def _prewarm(self) -> None:
+        """Open pooled connections to both APIs while the user is still speaking."""
+        http = _get_async_http_client()
+        if http is None:
+            return
+        urls = (str(self.tts.client.base_url), str(self.llm.async_client.base_url))
+        # Only the TCP/TLS setup matters: unauthenticated HEADs on API roots answer 4xx, which is fine
+        await asyncio.gather(*(http.head(url) for url in urls), return_exceptions=True)
+
+    async def _listen_task(self, utterances: "asyncio.Queue[Optional[str]]") -> None:
+        try:
+            while self._running:
+                utterance = await asyncio.to_thread(self.stt.listen)
+                if not utterance:
+                    continue
+                normalized = utterance.strip().casefold()
+                print(f"You: {utterance}")
+                if len(normalized) <= self._max_exit_len and normalized in self.config.exit_phrases:
+                    print("Exit phrase detected. Goodbye!")
+                    break
+                self._turn_done.clear()
+                await utterances.put(utterance)
+                if not self.config.full_duplex:
+                    # Without echo cancellation the mic would transcribe our own reply
+                    await self._turn_done.wait()
+        finally:
+            await utterances.put(None)
+
+    async def _respond_task(
+        self,
+        utterances: "asyncio.Queue[Optional[str]]",
+        replies: "asyncio.Queue[Optional[asyncio.Queue[Optional[str]]]]",
+    ) -> None:
+        try:
+            while True:
+                utterance = await utterances.get()
+                if utterance is None:
+                    break
+                human_msg = HumanMessage(content=utterance)
+                messages = [*self.history, human_msg]
+                # Hand the speaker this reply's sentence queue before the first token arrives
+                sentences: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+                await replies.put(sentences)
+                try:
+                    ai_message = await self.llm.astream_sentences(messages, sentences.put)
+                except Exception as exc:  # pragma: no cover - SDK errors
+                    print(f"[Cerebras error] {exc}", file=sys.stderr)
+                    continue
+                finally:
+                    await sentences.put(None)
+                response_text = self._extract_text(ai_message)
+                if not response_text:
+                    print("Assistant: (no response)")
+                    continue
+                self.history.append(human_msg)
+                self.history.append(ai_message)
+                self._trim_history()
+                persist_q = self._persist_q  # The writer clears this if the log can't be opened
+                if persist_q is not None:
+                    try:
+                        persist_q.put_nowait((utterance, response_text))
+                    except queue.Full:
+                        print("[History log] Writer is behind; dropping an exchange.", file=sys.stderr)
+                if not self.llm.last_stream_printed:
+                    print(f"Assistant: {response_text}")
+        finally:
+            await replies.put(None)
+
+    async def _speak_task(self, replies: "asyncio.Queue[Optional[asyncio.Queue[Optional[str]]]]") -> None:
+        while True:
+            sentences = await replies.get()
+            if sentences is None:
                 break
-            human_msg = HumanMessage(content=utterance)
-            messages = [*self.history, human_msg]
             try:
-                ai_message = self.llm.invoke(messages)
+                await self.tts.speak_sentences(sentences)
             except Exception as exc:  # pragma: no cover - SDK errors
-                print(f"[Cerebras error] {exc}", file=sys.stderr)
-                continue
-            response_text = self._extract_text(ai_message)
-            if not response_text:
-                print("Assistant: (no response)")
-                continue
-            self.history.append(human_msg)
-            self.history.append(ai_message)
-            if not self.llm.last_stream_printed:
-                print(f"Assistant: {response_text}")
-            self.tts.speak(response_text)
+                print(f"[TTS error] {exc}", file=sys.stderr)
+            finally:
+                self._turn_done.set()
+
+    def _trim_history(self) -> None:
+        """Drop the oldest exchanges past history_max_turns, keeping the system message."""
+        prefix_len = 1 if self.history and isinstance(self.history[0], SystemMessage) else 0
+        excess = len(self.history) - prefix_len - 2 * self.config.history_max_turns
+        if excess > 0:
+            del self.history[prefix_len:prefix_len + excess]
 
     @staticmethod
     def _extract_text(message: BaseMessage) -> str:
@@ -449,12 +1253,13 @@ def main() -> None:
     loop = ConversationLoop(config)
     _install_signal_handlers(loop)
     try:
-        loop.run()
+        _run_coroutine(loop.run())
     except KeyboardInterrupt:
         print("\nInterrupted by user.", file=sys.stderr)
     finally:
         loop.stop()
         time.sleep(0.2)
+        loop.stt.close()
 
 
 if __name__ == "__main__":
@@ -303,10 +303,18 @@ export function ResponsiveAIAssistant() {
       }
     });
 
-    newSocket.on('ai_start', () => {
+    // Text of the reply being streamed; ai_complete no longer repeats it
+    let streamedResponse = '';
+    // Id the server gave the current reply; its chunks and audio carry the same id
+    let streamingMessageId: string | null = null;
+    const isCurrentReply = (data: any) => !data.messageId || data.messageId === streamingMessageId;
+
+    newSocket.on('ai_start', (data) => {
       console.log('[WebSocket] AI started responding');
       setIsAIResponding(true);
       setCurrentAIMessage('');
+      streamedResponse = '';
+      streamingMessageId = data?.messageId ?? null;
       
       // Stop speech recognition when AI starts responding
       if (recognition && isRecognitionRunningRef.current) {
@@ -322,7 +330,9 @@ export function ResponsiveAIAssistant() {
     });
 
     newSocket.on('ai_chunk', (data) => {
+      if (!isCurrentReply(data)) return;
       console.log('[WebSocket] Received chunk:', data.content);
+      streamedResponse += data.content;
       setCurrentAIMessage(prev => prev + data.content);
     });
 
@@ -332,8 +342,8 @@ export function ResponsiveAIAssistant() {
       
       const audioUrl = buildAudioUrl(data.audioBase64, data.audioMimeType);
       const aiMessage: Message = {
-        id: Date.now().toString(),
-        text: data.fullResponse,
+        id: data.messageId || streamingMessageId || Date.now().toString(),
+        text: data.fullResponse ?? streamedResponse,
         sender: 'ai',
         timestamp: new Date(),
         audioUrl
@@ -365,6 +375,24 @@ export function ResponsiveAIAssistant() {
       // If audio mode is on, recognition will be resumed by playNextAudio after audio completes
     });
 
+    // Streamed replies are voiced sentence by sentence, in order
+    newSocket.on('audio_chunk', (data) => {
+      // Late audio from a reply that has since been superseded is dropped
+      if (!isCurrentReply(data)) return;
+      const audioUrl = buildAudioUrl(data.audioBase64, data.audioMimeType);
+      if (audioUrl && audioModeRef.current) {
+        enqueueAudio(audioUrl);
+      }
+    });
+
+    // Audio for HTTP-initiated replies arrives separately once synthesized
+    newSocket.on('audio_ready', (data) => {
+      const audioUrl = buildAudioUrl(data.audioBase64, data.audioMimeType);
+      if (audioUrl && audioModeRef.current) {
+        enqueueAudio(audioUrl);
+      }
+    });
+
     newSocket.on('error', (data) => {
       console.error('[WebSocket] Error:', data.message);
       alert(`Error: ${data.message}`);
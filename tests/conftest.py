@@ -0,0 +1,52 @@
+import importlib
+import itertools
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# The backend modules import each other as top-level modules (``from speech import ...``)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "api"))
+
+# Name of each backend's end-of-stream flush for the think-tag filter
+_THINK_FLUSH = {"speech": "_flush_think_text", "gl_speech": "_flush_think_carry"}
+
+
+def _new_chat(module_name):
+    return importlib.import_module(module_name).LangChainCerebrasChat.model_construct()
+
+
+@pytest.fixture
+def speech_chat():
+    return _new_chat("speech")
+
+
+@pytest.fixture
+def gl_chat():
+    return _new_chat("gl_speech")
+
+
+@pytest.fixture(params=sorted(_THINK_FLUSH))
+def think_filter(request):
+    """A fresh chat model of each backend with its think-tag ``feed``/``flush`` pair.
+
+    ``in_pieces(text, sizes)`` streams ``text`` through the filter in chunks of
+    the cycled ``sizes`` and returns everything emitted, flush included.
+    """
+    chat = _new_chat(request.param)
+    feed = chat._filter_think_text
+    flush = getattr(chat, _THINK_FLUSH[request.param])
+
+    def in_pieces(text, sizes):
+        out = []
+        pos = 0
+        for size in itertools.cycle(sizes):
+            if pos >= len(text):
+                break
+            out.append(feed(text[pos:pos + size]))
+            pos += size
+        out.append(flush())
+        return "".join(out)
+
+    return SimpleNamespace(backend=request.param, chat=chat, feed=feed, flush=flush, in_pieces=in_pieces)
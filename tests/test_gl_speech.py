@@ -0,0 +1,185 @@
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import gl_speech
+
+
+def test_begin_stream_resets_think_state(gl_chat):
+    gl_chat._filter_think_text("<think>cut off <")
+    gl_chat._begin_stream()
+    assert gl_chat._filter_think_text("fresh") == "fresh"
+
+
+class _FakeEncoder:
+    def encode(self, texts, normalize_embeddings=False):
+        import numpy
+
+        return numpy.ones((len(texts), 4))
+
+
+def _semantic_cache():
+    numpy = pytest.importorskip("numpy")
+    cache = object.__new__(gl_speech.SemanticCache)
+    cache._np = numpy
+    cache.model = _FakeEncoder()
+    return cache
+
+
+def test_semantic_cache_key_depends_on_mode_and_system_context():
+    cache = _semantic_cache()
+    question = gl_speech.HumanMessage(content="What is a derivative?")
+    system = gl_speech.SystemMessage(content="You are a tutor.")
+    summary = gl_speech.SystemMessage(content="Summary of earlier: limits")
+    hashes = {
+        cache.key([question], "exploratory").context_hash,
+        cache.key([question], "exam_prep").context_hash,
+        cache.key([system, question], "exploratory").context_hash,
+        cache.key([system, summary, question], "exploratory").context_hash,
+    }
+    assert len(hashes) == 4
+
+
+def test_semantic_cache_key_ignores_history_beyond_context_window():
+    cache = _semantic_cache()
+    system = gl_speech.SystemMessage(content="You are a tutor.")
+    question = gl_speech.HumanMessage(content="And the integral?")
+    recent = [gl_speech.HumanMessage(content=f"q{i}") for i in range(gl_speech.SEMANTIC_CACHE_CONTEXT_MESSAGES)]
+    old_a = gl_speech.HumanMessage(content="old a")
+    old_b = gl_speech.HumanMessage(content="old b")
+    key_a = cache.key([system, old_a, *recent, question], "exploratory")
+    key_b = cache.key([system, old_b, *recent, question], "exploratory")
+    assert key_a.context_hash == key_b.context_hash
+
+
+def test_vad_calibrates_once_and_respects_energy_floor():
+    numpy = pytest.importorskip("numpy")
+    vad = gl_speech.VADetector(frame_ms=20, min_energy=300)
+    quiet = numpy.full(320, 10, dtype=numpy.int16)
+    loud = numpy.full(320, 2000, dtype=numpy.int16)
+    assert vad.is_speech(loud)  # speech before calibration is not swallowed
+    for _ in range(vad._calibration_frames):
+        assert not vad.is_speech(quiet)
+    assert vad.calibrated
+    assert vad.energy == 300  # 1.5 * ambient RMS would be 15
+    assert vad.is_speech(loud)
+    assert not vad.is_speech(numpy.full(320, 200, dtype=numpy.int16))
+
+
+class _FakeEngine:
+    """Stands in for pyttsx3: runAndWait fires word callbacks until stopped."""
+
+    def __init__(self):
+        self.spoken = []
+        self.stop_threads = []
+        self.speaking = threading.Event()
+        self.on_word = None
+        self._stopped = False
+
+    def say(self, text):
+        self.spoken.append(text)
+        self._stopped = False
+
+    def runAndWait(self):
+        self.speaking.set()
+        while not self._stopped:
+            self.on_word("started-word", 0, 1)
+            threading.Event().wait(0.005)
+
+    def stop(self):
+        self.stop_threads.append(threading.current_thread())
+        self._stopped = True
+
+
+def test_tts_cancel_stops_pyttsx3_on_its_worker_thread(monkeypatch):
+    engine = _FakeEngine()
+
+    def _init_engine(self):
+        self.engine = engine
+        engine.on_word = self._on_word
+
+    monkeypatch.setattr(gl_speech.TextToSpeechEngine, "_init_engine", _init_engine)
+    tts = gl_speech.TextToSpeechEngine()
+    tts.speak("first sentence")
+    tts.speak("queued before cancel")
+    assert engine.speaking.wait(2.0)
+    tts.cancel()
+    tts.flush()
+    assert engine.spoken == ["first sentence"]
+    assert engine.stop_threads == [tts._thr]
+
+
+class _FakeTask:
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def _speculating_loop(prompt):
+    loop = object.__new__(gl_speech.ConversationLoop)
+    task = _FakeTask()
+    loop._speculation = gl_speech._Speculation(prompt, None, task)
+    return loop, task
+
+
+@pytest.mark.parametrize("utterance", ["What is a derivative", "what is a derivative?", "What is a derivat"])
+def test_speculation_is_reused_when_the_final_transcript_matches(utterance):
+    loop, task = _speculating_loop("what is a derivative")
+    assert loop._claim_speculation(utterance) is not None
+    assert not task.cancelled
+    assert loop._speculation is None
+
+
+@pytest.mark.parametrize("utterance", ["what is an integral", "what is a derivative of sine squared"])
+def test_speculation_is_cancelled_when_the_final_transcript_differs(utterance):
+    loop, task = _speculating_loop("what is a derivative")
+    assert loop._claim_speculation(utterance) is None
+    assert task.cancelled
+    assert loop._speculation is None
+
+
+def test_barge_in_cancels_speech_from_the_monitor_thread(monkeypatch):
+    numpy = pytest.importorskip("numpy")
+    cancel_threads = []
+    loop = object.__new__(gl_speech.ConversationLoop)
+    loop.config = SimpleNamespace(barge_in_threshold=500)
+    loop.tts = SimpleNamespace(speaking=True)
+    loop._interrupted = threading.Event()
+    loop._running = True
+
+    class _Streamer:
+        def cancel(self):
+            cancel_threads.append(threading.current_thread())
+            loop._running = False
+
+    loop.streamer = _Streamer()
+
+    class _InputStream:
+        def __init__(self, callback, **_kwargs):
+            self.callback = callback
+
+        def __enter__(self):
+            # The audio callback runs on PortAudio's thread; simulate that
+            loud = numpy.full((320, 1), 2000, dtype=numpy.int16)
+            thread = threading.Thread(
+                target=lambda: [self.callback(loud, 320, None, None) for _ in range(gl_speech.BARGE_IN_FRAMES)]
+            )
+            thread.start()
+            thread.join()
+            self.callback_thread = thread
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    monkeypatch.setitem(sys.modules, "sounddevice", type(sys)("sounddevice"))
+    sys.modules["sounddevice"].InputStream = _InputStream
+    monitor = threading.Thread(target=loop._barge_in_monitor)
+    monitor.start()
+    monitor.join(timeout=2.0)
+    assert loop._interrupted.is_set()
+    assert cancel_threads == [monitor]
@@ -0,0 +1,160 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import server
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _store(maxsize=3, ttl=10):
+    clock = _Clock()
+    evicted = []
+    store = server.SessionStore(maxsize=maxsize, ttl=ttl, on_evict=evicted.append, timer=clock)
+    return store, clock, evicted
+
+
+def test_session_store_evicts_least_recently_used():
+    store, _clock, evicted = _store(maxsize=2)
+    store["a"] = "A"
+    store["b"] = "B"
+    assert store["a"] == "A"  # "a" is now the most recently used
+    store["c"] = "C"
+    assert evicted == ["B"]
+    assert "b" not in store and "a" in store and "c" in store
+
+
+def test_session_store_reads_extend_ttl():
+    store, clock, evicted = _store(ttl=10)
+    store["a"] = "A"
+    store["b"] = "B"
+    clock.now = 8
+    assert store["a"] == "A"
+    clock.now = 15
+    store["c"] = "C"  # Writes expire idle entries first
+    assert "a" in store
+    assert "b" not in store
+    assert evicted == ["B"]
+
+
+def test_session_store_reports_replaced_and_deleted_values():
+    store, _clock, evicted = _store()
+    store["a"] = "A"
+    store["a"] = "A"
+    assert evicted == []
+    store["a"] = "A2"
+    del store["a"]
+    assert evicted == ["A", "A2"]
+
+
+def test_pdf_text_round_trips_through_compressed_store():
+    text = "Lecture 1: eigenvalues — λ ≥ 0.\n" * 50
+    key = server.store_pdf_text(text)
+    assert key == server.pdf_key(text)
+    assert len(server._PDF_BLOBS[key]) < len(text.encode("utf-8"))
+    server.pdf_storage["session-1"] = key
+    try:
+        assert server.load_pdf_text("session-1") == text
+    finally:
+        del server.pdf_storage["session-1"]
+    assert server.load_pdf_text("session-1") == ""
+    assert server.load_pdf_text(None) == ""
+
+
+def test_pdf_key_is_stable_and_content_addressed():
+    assert server.pdf_key("abc") == server.pdf_key("abc")
+    assert server.pdf_key("abc") != server.pdf_key("abd")
+    assert len(server.pdf_key("abc")) == 32
+
+
+def test_sessions_on_the_same_pdf_share_one_prompt_and_keep_no_text(monkeypatch):
+    monkeypatch.setenv("CEREBRAS_API_KEY", "test-key")
+    text = "Chapter 1. Vectors and matrices.\n" * 20
+    first = server.ConversationSession("s1", text)
+    second = server.ConversationSession("s2", text)
+    assert not hasattr(first, "pdf_text")
+    assert first.pdf_key == second.pdf_key == server.pdf_key(text)
+    # The material message is the same object for both sessions, not a per-session copy
+    assert first.history[1].content is second.history[1].content
+    assert text in first.history[1].content
+
+
+class _FakeSocketIO:
+    def __init__(self):
+        self.emitted = []
+        self.threads = []
+
+    def start_background_task(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def emit(self, event, data, room=None):
+        self.emitted.append((event, data, room))
+
+
+def test_sentence_audio_stream_emits_chunks_in_order_with_message_id(monkeypatch):
+    fake = _FakeSocketIO()
+    monkeypatch.setattr(server, "socketio", fake)
+
+    def _payload(sentence):
+        # Earlier sentences finish last, so emission order must come from submission order
+        time.sleep(0.05 if sentence.startswith("One") else 0)
+        return {"audioBase64": sentence.strip()}
+
+    conv = SimpleNamespace(tts=object(), session_id="room", build_audio_payload=_payload)
+    audio = server.SentenceAudioStream(conv, "msg-1")
+    audio.feed("One. Two")
+    audio.feed(" more. Three")
+    audio.close()
+    fake.threads[0].join(timeout=2.0)
+    assert fake.emitted == [
+        ("audio_chunk", {"audioBase64": "One.", "index": 0, "messageId": "msg-1"}, "room"),
+        ("audio_chunk", {"audioBase64": "Two more.", "index": 1, "messageId": "msg-1"}, "room"),
+        ("audio_chunk", {"audioBase64": "Three", "index": 2, "messageId": "msg-1"}, "room"),
+    ]
+
+
+class _KeywordEmbedder:
+    """One dimension per keyword, so similarity is keyword overlap."""
+
+    KEYWORDS = ("derivative", "integral", "matrix")
+
+    def encode(self, texts, normalize_embeddings=True):
+        import numpy
+
+        return numpy.array([[float(word in text) for word in self.KEYWORDS] for text in texts])
+
+
+def test_chunk_text_packs_paragraphs_and_slices_long_ones():
+    text = "a" * 5 + "\n\n" + "b" * 5 + "\n\n" + "c" * 25
+    assert server._chunk_text(text, size=12) == ["aaaaa\n\nbbbbb", "c" * 12, "c" * 12, "c"]
+
+
+def test_pdf_retriever_returns_top_chunks_in_document_order(monkeypatch):
+    pytest.importorskip("numpy")
+    monkeypatch.setattr(server, "_get_embedder", _KeywordEmbedder)
+    # Paragraphs longer than half a chunk each land in a chunk of their own
+    filler = " " + "x" * (server.PDF_CHUNK_CHARS // 2)
+    chunks = [f"{topic}{filler}" for topic in ("the integral of", "matrix rank", "derivative rules", "integral tables")]
+    retriever = server.PdfRetriever("\n\n".join(chunks))
+    assert retriever.chunks == chunks
+    content = retriever.context_message("what is an integral?", k=2).content
+    assert f"the integral of{filler}\n\nintegral tables" in content
+    assert "matrix" not in content and "derivative" not in content
+
+
+def test_orjson_providers_round_trip():
+    pytest.importorskip("orjson")
+    payload = {"messageId": "abc", "content": "héllo", "index": 2}
+    assert type(server.app.json).__name__ == "OrjsonProvider"
+    assert server.app.json.loads(server.app.json.dumps(payload)) == payload
+    assert server._OrjsonSocketIOJson.loads(server._OrjsonSocketIOJson.dumps(payload)) == payload
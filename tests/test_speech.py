@@ -0,0 +1,200 @@
+import asyncio
+import itertools
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import speech
+
+
+def test_think_filter_flush_inside_unclosed_think_clears_pending(speech_chat):
+    assert speech_chat._filter_think_text("ok<think>still </th") == "ok"
+    assert speech_chat._flush_think_text() == ""
+    assert speech_chat._think_pending == ""
+
+
+np = pytest.importorskip("numpy")
+
+
+def _ring_recognizer(frames):
+    recognizer = object.__new__(speech.SpeechRecognizer)
+    recognizer._ring = np.zeros(frames * speech.VAD_FRAME_SAMPLES, np.int16)
+    recognizer._write_pos = 0
+    recognizer._data_ready = threading.Event()
+    recognizer._pa_continue = 0
+    return recognizer
+
+
+def test_ring_buffer_reads_frames_in_order_across_wraparound():
+    recognizer = _ring_recognizer(8)
+    samples = np.arange(20 * speech.VAD_FRAME_SAMPLES, dtype=np.int16)
+    frames = []
+    pos = written = 0
+    # Callback buffers that don't line up with frames or the ring size
+    for size in itertools.cycle((300, 700, 129)):
+        if written >= len(samples):
+            break
+        recognizer._on_audio(samples[written:written + size].tobytes(), size, None, None)
+        written += size
+        while recognizer._write_pos - pos >= speech.VAD_FRAME_SAMPLES:
+            frame, pos = recognizer._read_frame(pos)
+            frames.append(frame)
+    read = np.concatenate(frames)
+    assert len(read) == 20 * speech.VAD_FRAME_SAMPLES
+    assert (read == samples[:len(read)]).all()
+
+
+def test_ring_buffer_skips_ahead_after_overrun():
+    recognizer = _ring_recognizer(4)
+    samples = np.arange(10 * speech.VAD_FRAME_SAMPLES, dtype=np.int16)
+    recognizer._on_audio(samples.tobytes(), len(samples), None, None)
+    frame, pos = recognizer._read_frame(0)
+    # Only the newest frame is still intact; the reader resumes from there
+    assert (frame == samples[-speech.VAD_FRAME_SAMPLES:]).all()
+    assert pos == recognizer._write_pos
+
+
+class _FakeStream:
+    def __init__(self, pieces):
+        self._pieces = iter(pieces)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            piece = next(self._pieces)
+        except StopIteration:
+            raise StopAsyncIteration
+        delta = type("Delta", (), {"content": piece})()
+        choice = type("Choice", (), {"delta": delta})()
+        return type("Chunk", (), {"choices": [choice]})()
+
+
+class _FakeCompletions:
+    def __init__(self, pieces):
+        self._pieces = pieces
+
+    async def create(self, **_kwargs):
+        return _FakeStream(self._pieces)
+
+
+def test_astream_sentences_emits_each_sentence_as_it_ends(speech_chat):
+    chat = speech_chat
+    chat.config = SimpleNamespace(
+        cerebras_model="m", cerebras_max_tokens=1, cerebras_temperature=0.0, cerebras_top_p=1.0
+    )
+    pieces = ["<think>plan</think>Hello the", "re. How are", " you?\nFine! 3.5 is", " a number"]
+    chat.async_client = SimpleNamespace(chat=SimpleNamespace(completions=_FakeCompletions(pieces)))
+    sentences = []
+
+    async def _collect(sentence):
+        sentences.append(sentence)
+
+    message = asyncio.run(chat.astream_sentences([speech.HumanMessage(content="hi")], _collect))
+    assert sentences == ["Hello there.", "How are you?", "Fine!", "3.5 is a number"]
+    assert message.content == "Hello there. How are you?\nFine! 3.5 is a number"
+
+
+def _loop_with_history(history, max_turns):
+    loop = object.__new__(speech.ConversationLoop)
+    loop.config = SimpleNamespace(history_max_turns=max_turns)
+    loop.history = list(history)
+    return loop
+
+
+def test_trim_history_keeps_system_message_and_newest_turns():
+    system = speech.SystemMessage(content="sys")
+    turns = [speech.HumanMessage(content=f"q{i}") if i % 2 == 0 else speech.AIMessage(content=f"a{i}") for i in range(10)]
+    loop = _loop_with_history([system, *turns], max_turns=2)
+    loop._trim_history()
+    assert loop.history == [system, *turns[-4:]]
+
+
+def test_trim_history_without_system_message():
+    turns = [speech.HumanMessage(content=str(i)) for i in range(6)]
+    loop = _loop_with_history(turns, max_turns=2)
+    loop._trim_history()
+    assert loop.history == turns[-4:]
+    loop._trim_history()
+    assert loop.history == turns[-4:]
+
+
+def test_public_think_filter_api_isolates_consecutive_streams(speech_chat):
+    chat = speech_chat
+    chat.reset_think_filter()
+    assert chat.filter_stream_piece("first <think>cut off mid-thought </th") == "first "
+    assert chat.flush_think_filter() == ""
+    chat.reset_think_filter()
+    assert chat.filter_stream_piece("second reply <") == "second reply "
+    assert chat.flush_think_filter() == "<"
+
+
+def test_speak_sentences_cancels_pending_synthesis_when_cancelled():
+    pytest.importorskip("numpy")
+    if speech.np is None:
+        pytest.skip("numpy unavailable to speech")
+    started = []
+    cancelled = []
+
+    async def _collect(text):
+        started.append(text)
+        try:
+            if text == "one.":
+                return b"\x00\x00"
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(text)
+            raise
+
+    async def _play(_samples):
+        await asyncio.Event().wait()
+
+    tts = object.__new__(speech.TextToSpeechEngine)
+    tts._response_format = "pcm"
+    tts._collect_audio_bytes = _collect
+    tts.player = SimpleNamespace(play=_play)
+
+    async def _run():
+        sentences = asyncio.Queue()
+        for sentence in ("one.", "two.", "three."):
+            sentences.put_nowait(sentence)
+        task = asyncio.create_task(tts.speak_sentences(sentences))
+        while len(started) < 3:
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        # Checked before asyncio.run tears down leftover tasks itself
+        assert sorted(cancelled) == ["three.", "two."]
+
+    asyncio.run(_run())
+
+
+def _persisting_loop(path):
+    loop = object.__new__(speech.ConversationLoop)
+    loop.config = SimpleNamespace(history_log_path=str(path))
+    loop._running = True
+    loop._persist_q = speech.queue.Queue()
+    loop._persist_thread = threading.Thread(target=loop._persist_worker, daemon=True)
+    loop._persist_thread.start()
+    return loop
+
+
+def test_stop_flushes_history_log_and_joins_writer(tmp_path):
+    path = tmp_path / "history.jsonl"
+    loop = _persisting_loop(path)
+    loop._persist_q.put(("hi", "hello"))
+    loop.stop()
+    assert not loop._persist_thread.is_alive()
+    assert path.read_text(encoding="utf-8") == '{"user": "hi", "assistant": "hello"}\n'
+
+
+def test_history_log_open_failure_is_logged_and_disables_logging(tmp_path, capsys):
+    loop = _persisting_loop(tmp_path / "missing" / "history.jsonl")
+    loop._persist_thread.join(timeout=2.0)
+    assert loop._persist_q is None
+    assert "[History log] Disabled" in capsys.readouterr().err
+    loop.stop()  # Nothing left to signal
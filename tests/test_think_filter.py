@@ -0,0 +1,30 @@
+import pytest
+
+# A stray closing tag outside a think block is kept by speech and dropped by gl_speech
+_EXPECTED = {
+    "speech": "Hi there </think> a<b <thin",
+    "gl_speech": "Hi there  a<b <thin",
+}
+
+
+@pytest.mark.parametrize("sizes", [(1,), (2,), (3,), (5,), (1, 4, 2), (100,)])
+def test_think_filter_is_independent_of_chunking(think_filter, sizes):
+    text = "Hi <think>private < notes</think>there </think> a<b <thin"
+    assert think_filter.in_pieces(text, sizes) == _EXPECTED[think_filter.backend]
+
+
+def test_think_filter_flushes_trailing_partial_tag(think_filter):
+    assert think_filter.feed("answer </th") == "answer "
+    assert think_filter.flush() == "</th"
+
+
+def test_think_filter_drops_carry_inside_unclosed_think(think_filter):
+    assert think_filter.feed("ok<think>still thinking </thi") == "ok"
+    assert think_filter.flush() == ""
+    assert think_filter.chat._inside_think
+
+
+def test_think_filter_passes_tagless_chunks_through(think_filter):
+    assert think_filter.feed("plain text") == "plain text"
+    think_filter.chat._inside_think = True
+    assert think_filter.feed("hidden text") == ""